@@ -1,8 +1,13 @@
 from ._criterion import (
     abs_deviation,
     relative_diff,
-    # discrepancy_diff
+    discrepancy_diff
 )
 
 from ._sole import *
 
+from ._krylov import (
+    ConjugateGradientSolver,
+    BiCGSTABSolver,
+    GMRESSolver,
+)
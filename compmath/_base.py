@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import compmath._criterion as _criterion
 
 
@@ -34,10 +35,30 @@ class BasicSolver(ABC):
         self.max_iter = max_iter
 
         # get criterion function by name
-        try:
-            self.crit_func = getattr(_criterion, self.criterion)
-        except AttributeError:
+        if self.criterion not in ('abs_deviation', 'relative_diff', 'discrepancy_diff'):
             raise ValueError(f'Criterion function {self.criterion} not found')
+        self.crit_func = getattr(_criterion, self.criterion)
+
+    def _bind_criterion(self, A, b, size):
+        """
+        Return check(prev, x, r=None) -> float, the criterion bound to the system with its work
+        buffer allocated once. r is the residual b - A * x when the method already has it,
+        discrepancy_diff uses it instead of a mat-vec.
+        """
+        crit_func = self.crit_func
+        work = np.empty(size)
+
+        if self.criterion != 'discrepancy_diff':
+            return lambda prev, x, r=None: crit_func(prev, x, out=work)
+
+        def check(prev, x, r=None):
+            d = crit_func(A, b, x, r=r, out=work)
+            if r is not None and d < self.eps:
+                # an updated residual drifts from the true one, so convergence is confirmed once
+                d = crit_func(A, b, x, out=work)
+            return d
+
+        return check
 
     @abstractmethod
     def solve(self, **kwargs):
@@ -1,15 +1,40 @@
+import numpy as np
 from compmath.linalg import Matrix
 
 
-def abs_deviation(prev: list, cur: list):
-    return max([abs(prev[i] - cur[i]) for i in range(len(prev))])
+def _as_vector(x):
+    return np.ravel(x.rows if isinstance(x, Matrix) else x)
 
 
-def relative_diff(prev: list, cur: list):
-    return max([abs((prev[i] - cur[i]) / cur[i]) if cur[i] != 0 else float('inf') for i in range(len(prev))])
+def abs_deviation(prev, cur, out=None):
+    """
+    The largest absolute change of a component, out is an optional work buffer of shape (n,)
+    """
+    d = np.subtract(_as_vector(prev), _as_vector(cur), out=out)
+    return float(np.max(np.abs(d, out=d)))
 
 
-# def discrepancy_diff(A: Matrix, b: Matrix, x: Matrix):
-#     r = A * x - b
-#     return max([r[i] for i in range(len(r))])
+def relative_diff(prev, cur, out=None):
+    """
+    The largest relative change of a component, infinite when a component of cur is zero.
+    out is an optional work buffer of shape (n,)
+    """
+    cur = _as_vector(cur)
+    d = np.subtract(_as_vector(prev), cur, out=out)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(d, cur, out=d)
+    d = float(np.max(np.abs(d, out=d)))
+    # 0 / 0 gives nan, the component is treated like any other zero one
+    return d if d == d else np.inf
 
+
+def discrepancy_diff(A, b, x, r=None, out=None):
+    """
+    The largest absolute component of the residual b - A * x.
+    A can be a Matrix, a SparseMatrix or a LinearOperator. A method that already has the residual
+    passes it as r and no mat-vec is made. out is an optional work buffer of shape (n,)
+    """
+    if r is None:
+        r = A.matvec(_as_vector(x), out=out)
+        r = np.subtract(_as_vector(b), r, out=r)
+    return float(max(np.max(r), -np.min(r)))
@@ -0,0 +1,282 @@
+from abc import abstractmethod
+import numpy as np
+from compmath.linalg import (
+    Matrix,
+    aslinearoperator,
+    JacobiPreconditioner,
+    ILU0Preconditioner,
+)
+
+from ._base import BasicSolver
+
+
+class _KrylovSolver(BasicSolver):
+    """
+    Common part of the Krylov subspace solvers
+
+    A can be a Matrix, a SparseMatrix, a LinearOperator or any object with `shape` and `matvec`.
+
+    Attributes
+    -------------
+
+    preconditioner: str or object, optional (default=None) -- 'jacobi', 'ilu0'
+    or an object with an apply(r) method returning M^-1 * r
+
+    store_iterates: bool, optional (default=True) -- Keep a copy of every iterate in the log.
+    Otherwise only the criterion values and the final iterate are logged.
+
+    """
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            preconditioner=None,
+            store_iterates=True
+    ):
+        super().__init__(criterion, eps, max_iter)
+        self.preconditioner = preconditioner
+        self.store_iterates = store_iterates
+
+    def _make_preconditioner(self, A):
+        if self.preconditioner is None:
+            return None
+        if self.preconditioner == 'jacobi':
+            return JacobiPreconditioner(A)
+        if self.preconditioner == 'ilu0':
+            return ILU0Preconditioner(A)
+        if isinstance(self.preconditioner, str):
+            raise ValueError(f'Unknown preconditioner {self.preconditioner}')
+        return self.preconditioner
+
+    def solve(self, **kwargs):
+        """
+        Solve the system of linear equations Ax = b
+
+        Required keyword Arguments:
+        - A: Matrix, SparseMatrix or linear operator of shape (n, n)
+        - b: Matrix of shape (n, 1) or array of shape (n,)
+
+        Optional keyword Arguments:
+        - x0: initial approximation, zeros by default
+        """
+        A = kwargs['A']
+        M = self._make_preconditioner(A)
+        op = aslinearoperator(A)
+
+        b = kwargs['b']
+        b = np.ravel(b.rows if isinstance(b, Matrix) else b).astype(np.float64)
+
+        x = np.zeros(op.num_cols)
+        x0 = kwargs.get('x0')
+        if x0 is not None:
+            x[:] = np.ravel(x0.rows if isinstance(x0, Matrix) else x0)
+
+        res = [(x[:, None].copy(), '-')]
+        self._check = self._bind_criterion(op, b, op.num_cols)
+        self._iterate(op, b, x, M, res)
+
+        if not self.store_iterates:
+            res[-1] = (x[:, None], res[-1][1])
+
+        return res
+
+    def _log(self, res, prev, x, r=None):
+        """
+        Append the current iterate to the log, returns True when the method has converged.
+        r is the updated residual of x when the method keeps one.
+        """
+        d = self._check(prev, x, r)
+        res.append((x[:, None].copy() if self.store_iterates else None, d))
+        return d < self.eps
+
+    @abstractmethod
+    def _iterate(self, op, b, x, M, res):
+        pass
+
+
+def _precondition(M, r):
+    return r.copy() if M is None else M.apply(r)
+
+
+class ConjugateGradientSolver(_KrylovSolver):
+    """
+    Preconditioned conjugate gradient method for symmetric positive definite systems
+    """
+
+    def _iterate(self, op, b, x, M, res):
+        prev = np.empty_like(x)
+        Ap = np.empty_like(x)
+
+        r = b - op.matvec(x)
+        z = _precondition(M, r)
+        p = z.copy()
+        rz = r @ z
+
+        for _ in range(self.max_iter):
+            if rz == 0:
+                break
+
+            op.matvec(p, out=Ap)
+            alpha = rz / (p @ Ap)
+
+            prev[:] = x
+            x += alpha * p
+            r -= alpha * Ap
+
+            if self._log(res, prev, x, r):
+                break
+
+            z = _precondition(M, r)
+            rz, rz_prev = r @ z, rz
+            p *= rz / rz_prev
+            p += z
+
+
+class BiCGSTABSolver(_KrylovSolver):
+    """
+    Right-preconditioned BiCGSTAB method for nonsymmetric systems
+    """
+
+    def _iterate(self, op, b, x, M, res):
+        prev = np.empty_like(x)
+
+        p = np.zeros_like(x)
+        v = np.zeros_like(x)
+        t = np.empty_like(x)
+        r = r_hat = None
+
+        for _ in range(self.max_iter):
+            # (re)start from the true residual, also after a breakdown or when the recursively
+            # updated residual has drifted below eps while the iterate has not converged
+            if r is None or rho_new == 0 or omega == 0 or np.max(np.abs(r)) < self.eps:
+                r = b - op.matvec(x)
+                if not np.any(r):
+                    break
+                r_hat = r.copy()
+                p[:] = 0
+                v[:] = 0
+                rho = alpha = omega = 1.0
+
+            rho_new = r_hat @ r
+
+            beta = (rho_new / rho) * (alpha / omega)
+            p -= omega * v
+            p *= beta
+            p += r
+
+            p_hat = _precondition(M, p)
+            op.matvec(p_hat, out=v)
+            alpha = rho_new / (r_hat @ v)
+            s = r - alpha * v
+
+            s_hat = _precondition(M, s)
+            op.matvec(s_hat, out=t)
+            tt = t @ t
+            omega = (t @ s) / tt if tt != 0 else 0.0
+
+            prev[:] = x
+            x += alpha * p_hat
+            x += omega * s_hat
+            r = s - omega * t
+            rho = rho_new
+
+            if self._log(res, prev, x, r):
+                break
+
+
+class GMRESSolver(_KrylovSolver):
+    """
+    Restarted GMRES(m) with right preconditioning
+
+    Every inner iteration counts towards max_iter. The inner loop stops as soon as the residual
+    norm estimated from the Givens rotations drops below eps. The criterion is checked and the
+    iterate is logged after every restart cycle.
+
+    Attributes
+    -------------
+
+    restart: int, optional (default=30) -- The dimension of the Krylov subspace between restarts
+
+    """
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            preconditioner=None,
+            store_iterates=True,
+            restart=30
+    ):
+        super().__init__(criterion, eps, max_iter, preconditioner, store_iterates)
+        self.restart = restart
+
+    def _iterate(self, op, b, x, M, res):
+        n = len(x)
+        m = min(self.restart, n)
+        prev = np.empty_like(x)
+
+        V = np.empty((m + 1, n))
+        H = np.zeros((m + 1, m))
+        cs, sn = np.zeros(m), np.zeros(m)
+        g = np.zeros(m + 1)
+
+        r = b - op.matvec(x)
+        total = 0
+        while total < self.max_iter:
+            beta = np.linalg.norm(r)
+            if beta == 0:
+                break
+
+            V[0] = r / beta
+            H[:] = 0
+            g[:] = 0
+            g[0] = beta
+
+            k = 0
+            while k < m and total < self.max_iter:
+                w = op.matvec(_precondition(M, V[k]))
+
+                # modified Gram-Schmidt
+                for i in range(k + 1):
+                    H[i, k] = w @ V[i]
+                    w -= H[i, k] * V[i]
+                H[k + 1, k] = np.linalg.norm(w)
+                breakdown = H[k + 1, k] == 0
+                if not breakdown:
+                    V[k + 1] = w / H[k + 1, k]
+
+                # apply the previous rotations and eliminate H[k + 1, k]
+                for i in range(k):
+                    H[i, k], H[i + 1, k] = (cs[i] * H[i, k] + sn[i] * H[i + 1, k],
+                                            -sn[i] * H[i, k] + cs[i] * H[i + 1, k])
+                denom = np.hypot(H[k, k], H[k + 1, k])
+                if denom == 0:
+                    break
+                cs[k], sn[k] = H[k, k] / denom, H[k + 1, k] / denom
+                H[k, k], H[k + 1, k] = denom, 0.0
+                g[k], g[k + 1] = cs[k] * g[k], -sn[k] * g[k]
+
+                k += 1
+                total += 1
+                # the subspace is invariant after a breakdown, so the solution is exact
+                if abs(g[k]) < self.eps or breakdown:
+                    break
+
+            if k == 0:
+                break
+
+            # y solves the k x k upper triangular system H y = g
+            y = np.zeros(k)
+            for i in range(k - 1, -1, -1):
+                y[i] = (g[i] - H[i, i + 1:k] @ y[i + 1:]) / H[i, i]
+
+            prev[:] = x
+            x += _precondition(M, V[:k].T @ y)
+
+            # the true residual is needed for the next cycle anyway
+            r = b - op.matvec(x)
+            if self._log(res, prev, x, r) or abs(g[k]) == 0:
+                break
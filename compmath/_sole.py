@@ -1,5 +1,7 @@
-from compmath.linalg import Matrix, get_diagonally_dominant
-from compmath import _criterion
+from abc import abstractmethod
+import numpy as np
+from compmath.linalg import Matrix, SparseMatrix, diagonally_dominant_permutation
+from compmath.linalg._precond import _level_schedule
 from dataclasses import dataclass
 
 from ._base import BasicSolver
@@ -7,6 +9,14 @@ from ._base import BasicSolver
 
 @dataclass
 class SoleData:
+    """
+    Assembly buffer for a system of linear equations Ax = b
+
+    A and b live in preallocated buffers whose capacity doubles when the system grows,
+    so a sequence of resizes costs amortized O(1) per added element. A and b are
+    Matrix views into the buffers. freeze() compacts A in place and hands out read-only
+    views, so the solvers get the system without another copy.
+    """
     _n: int = 1
     _m: int = None
     _A: Matrix = None
@@ -16,22 +26,53 @@ class SoleData:
         if self._m is None:
             self._m = self._n
 
-        if self._A is not None:
-            old_A = self.A.copy()
-            self._A = Matrix([[0 for _ in range(self._m)] for _ in range(self._n)])
+        self._frozen = False
+        self._buf_A = np.zeros((self._n, self._m))
+        self._buf_b = np.zeros((self._n, 1))
 
-            self._A = Matrix([[old_A[i][j] if i < old_A.shape[0] and j < old_A.shape[1] else 0
-                               for j in range(self._m)] for i in range(self._n)])
-        else:
-            self._A = Matrix([[0 for _ in range(self._m)] for _ in range(self._n)])
+        if self._A is not None:
+            old_A = np.asarray(self._A.rows if isinstance(self._A, Matrix) else self._A, dtype=np.float64)
+            r, c = min(self._n, old_A.shape[0]), min(self._m, old_A.shape[1])
+            self._buf_A[:r, :c] = old_A[:r, :c]
 
         if self._b is not None:
-            old_b = self.b.copy()
-            self._b = Matrix([[0] for _ in range(self._n)])
+            old_b = np.ravel(self._b.rows if isinstance(self._b, Matrix) else self._b)
+            r = min(self._n, len(old_b))
+            self._buf_b[:r, 0] = old_b[:r]
 
-            self._b = Matrix([old_b[i] if i < old_b.shape[0] else [0] for i in range(self._n)])
-        else:
-            self._b = Matrix([[0] for _ in range(self._n)])
+        self._update_views()
+
+    def _update_views(self):
+        self._A = Matrix(self._buf_A[:self._n, :self._m])
+        self._b = Matrix(self._buf_b[:self._n])
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise ValueError('SoleData is frozen, call unfreeze() to modify it')
+
+    def _resize(self, n, m):
+        self._check_mutable()
+        cap_n, cap_m = self._buf_A.shape
+
+        if n > cap_n or m > cap_m:
+            new_cap = (max(n, 2 * cap_n) if n > cap_n else cap_n,
+                       max(m, 2 * cap_m) if m > cap_m else cap_m)
+            buf_A = np.zeros(new_cap)
+            buf_A[:self._n, :self._m] = self._buf_A[:self._n, :self._m]
+            self._buf_A = buf_A
+
+        if n > len(self._buf_b):
+            buf_b = np.zeros((self._buf_A.shape[0], 1))
+            buf_b[:self._n] = self._buf_b[:self._n]
+            self._buf_b = buf_b
+
+        # values cut off by shrinking must not reappear when the system grows back
+        self._buf_A[n:self._n] = 0
+        self._buf_A[:, m:self._m] = 0
+        self._buf_b[n:self._n] = 0
+
+        self._n, self._m = n, m
+        self._update_views()
 
     @property
     def n(self):
@@ -40,8 +81,7 @@ class SoleData:
     @n.setter
     def n(self, value):
         if value is not None:
-            self._n = value
-            self.__post_init__()
+            self._resize(value, self._m)
 
     @property
     def m(self):
@@ -49,8 +89,7 @@ class SoleData:
 
     @m.setter
     def m(self, value):
-        self._m = value
-        self.__post_init__()
+        self._resize(self._n, self._n if value is None else value)
 
     @property
     def A(self):
@@ -58,6 +97,7 @@ class SoleData:
 
     def set_A(self, i, j, value):
         if value is not None:
+            self._check_mutable()
             self._A[i][j] = value
 
     @property
@@ -66,58 +106,412 @@ class SoleData:
 
     def set_b(self, i, value):
         if value is not None:
+            self._check_mutable()
             self._b[i][0] = value
 
+    def set_block(self, i, j, block):
+        """
+        Write a 2d block into A with its top left corner at (i, j)
+        """
+        self._check_mutable()
+        block = np.asarray(block.rows if isinstance(block, Matrix) else block, dtype=np.float64)
+        if block.ndim != 2 or i + block.shape[0] > self._n or j + block.shape[1] > self._m:
+            raise ValueError('The block does not fit into the system')
+
+        self._buf_A[i:i + block.shape[0], j:j + block.shape[1]] = block
+
+    def set_rows(self, i, rows, values=None):
+        """
+        Write consecutive rows of A starting at row i and optionally the matching entries of b
+        """
+        self._check_mutable()
+        self.set_block(i, 0, rows)
+        if values is not None:
+            values = np.ravel(values.rows if isinstance(values, Matrix) else values)
+            if i + len(values) > self._n:
+                raise ValueError('The values do not fit into the system')
+            self._buf_b[i:i + len(values), 0] = values
+
+    def freeze(self):
+        """
+        Compact A in place and return read-only (A, b) views for the solvers.
+        The system can not be modified until unfreeze() is called.
+        """
+        if not self._frozen:
+            n, m = self._n, self._m
+            cap_n, cap_m = self._buf_A.shape
+            if m != cap_m:
+                # move every row next to the previous one, the buffer becomes C-contiguous (cap, m)
+                flat = self._buf_A.reshape(-1)
+                for i in range(1, n):
+                    flat[i * m:(i + 1) * m] = flat[i * cap_m:i * cap_m + m]
+                # the row capacity stays cap_n, it must match the capacity of b
+                self._buf_A = flat[:cap_n * m].reshape(cap_n, m)
+                self._buf_A[n:] = 0
+
+            self._frozen = True
+            self._update_views()
+            self._A.rows.flags.writeable = False
+            self._b.rows.flags.writeable = False
+
+        return self._A, self._b
+
+    def unfreeze(self):
+        """
+        Allow modifications again. The buffers are copied once,
+        so the matrices returned by freeze() keep their values.
+        """
+        if self._frozen:
+            self._buf_A = self._buf_A.copy()
+            self._buf_b = self._buf_b.copy()
+            self._frozen = False
+            self._update_views()
+
+
+class _StationarySolver(BasicSolver):
+    """
+    Common driver for the stationary iterations x_k+1 = x_k + M^-1 (b - A x_k)
+
+    Subclasses implement _sweep(), which updates the iterate in place. All work vectors are
+    allocated once per solve() call.
+
+    Attributes
+    -------------
+
+    store_iterates: bool, optional (default=True) -- Keep a copy of every iterate in the log.
+    Otherwise only the criterion values and the final iterate are logged.
 
-class SimpleIterationSolver(BasicSolver):
+    """
+
+    _require_dominance = False
 
     def __init__(
             self,
             criterion='abs_deviation',
             eps=1e-6,
-            max_iter=100
+            max_iter=100,
+            store_iterates=True
     ):
         super().__init__(criterion, eps, max_iter)
+        self.store_iterates = store_iterates
 
-    def solve(self, **kwargs):
+    def _prepare(self, A, b):
         """
-        This method implements the Simple Iteration algorithm to solve the system of linear functions
-        Ax = b
-
-        Required keyword Arguments:
-        - A: Matrix of shape (n, n)
-        - b: Matrix of shape (n, 1)
+        Bring the system to the form the iteration works on: (A, b, diag) with b a flat vector.
+        The equations are reordered to make A diagonally dominant when that is possible.
         """
+        b = np.ravel(b.rows if isinstance(b, Matrix) else b).astype(np.float64)
 
-        A, b = kwargs['A'], kwargs['b']
+        perm = diagonally_dominant_permutation(A)
+        if perm is None and self._require_dominance:
+            raise ValueError("The matrix A is not diagonally dominant. Method can't be used")
 
-        if A.det() == 0:
-            raise ValueError('The matrix A is singular')
+        if perm is not None:
+            # reorder the equations rather than the unknowns, so x keeps its order
+            order = np.argsort(perm)
+            if np.any(order != np.arange(len(order))):
+                A = A.permute_rows(order)
+                b = b[order]
 
-        A = get_diagonally_dominant(A)
-        if A is None:
-            raise ValueError("The matrix A is not diagonally dominant. Method can't be used")
+        diag = A.diagonal() if isinstance(A, SparseMatrix) else np.diagonal(A.rows).copy()
+        if not np.all(diag):
+            raise ValueError('The matrix A has zero diagonal elements. Method can\'t be used')
 
-        n = A.num_rows
+        return A, b, diag
 
-        x = Matrix([[0] for _ in range(n)])
+    def _setup(self, A, b, diag):
+        pass
 
-        C = Matrix([[-A[i][j] / A[i][i] if i != j else 0 for j in range(n)] for i in range(n)])
-        b = Matrix([[b[i][0] / A[i][i]] for i in range(n)])
+    @abstractmethod
+    def _sweep(self, A, b, diag, x):
+        """
+        Update x in place, return the residual b - A * x of the new iterate if the sweep computes it
+        """
+        pass
 
-        res = [([val for val in x], '-')]
+    def solve(self, **kwargs):
+        """
+        Solve the system of linear equations Ax = b
+
+        Required keyword Arguments:
+        - A: Matrix or SparseMatrix of shape (n, n)
+        - b: Matrix of shape (n, 1) or array of shape (n,)
+
+        Optional keyword Arguments:
+        - x0: initial approximation, zeros by default
+        """
+        A, b, diag = self._prepare(kwargs['A'], kwargs['b'])
+        self._setup(A, b, diag)
 
+        n = A.num_rows
+        x = np.zeros(n)
+        if kwargs.get('x0') is not None:
+            x[:] = np.ravel(kwargs['x0'].rows if isinstance(kwargs['x0'], Matrix) else kwargs['x0'])
+        prev = np.empty(n)
+
+        res = [(x[:, None].copy(), '-')]
+
+        check = self._bind_criterion(A, b, n)
         for _ in range(self.max_iter):
-            prev = x[:][0]
-            x = C * x + b
-            d = self.crit_func(x[:][0], prev)
-            res.append(([val for val in x], d))
+            prev[:] = x
+            r = self._sweep(A, b, diag, x)
+            d = check(prev, x, r)
+            res.append((x[:, None].copy() if self.store_iterates else None, d))
             if d < self.eps:
                 break
 
+        if not self.store_iterates:
+            res[-1] = (x[:, None], res[-1][1])
+
         return res
 
 
+class JacobiSolver(_StationarySolver):
+    """
+    Jacobi method: every component is updated from the previous iterate, one mat-vec per sweep
+    """
+
+    def _setup(self, A, b, diag):
+        self._r = np.empty(A.num_rows)
+        self._r_current = False
+
+    def _sweep(self, A, b, diag, x):
+        r = self._r
+        if not self._r_current:
+            A.matvec(x, out=r)
+            np.subtract(b, r, out=r)
+        r /= diag
+        x += r
+
+        # the residual of the new iterate serves the criterion and the next sweep
+        A.matvec(x, out=r)
+        np.subtract(b, r, out=r)
+        self._r_current = True
+        return r
+
+
+class GaussSeidelSolver(_StationarySolver):
+    """
+    Gauss-Seidel method with optional over-relaxation
+
+    Attributes
+    -------------
+
+    ordering: str, optional (default='natural') -- The order the components are updated in.
+    'natural' goes row by row. For a sparse A the sweep is the forward solve with D / omega + L,
+    level-scheduled like the ILU(0) solves: rows that do not depend on each other are updated
+    together. 'red_black' splits the unknowns into colors with no couplings inside a color
+    (red and black for the usual stencils) and updates a whole color at once.
+
+    omega: float, optional (default=1.0) -- The relaxation factor
+
+    """
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            store_iterates=True,
+            ordering='natural',
+            omega=1.0
+    ):
+        super().__init__(criterion, eps, max_iter, store_iterates)
+
+        if ordering not in ('natural', 'red_black'):
+            raise ValueError(f'Unknown ordering {ordering}')
+
+        self.ordering = ordering
+        self.omega = omega
+
+    def _setup(self, A, b, diag):
+        self._omega = self.omega
+        if self.ordering == 'red_black':
+            self._colors = []
+            for rows in _color_classes(A):
+                self._colors.append((rows, A.permute_rows(rows), np.empty(len(rows))))
+        elif isinstance(A, SparseMatrix):
+            self._schedule = None
+            rows, cols = A.row_ids, A.indices
+            lower, upper = rows > cols, rows < cols
+            schedule = _level_schedule(A.num_rows, rows[lower], cols[lower], A.data[lower], reverse=False)
+            # a chain of dependencies leaves little to vectorize, the plain row loop is cheaper then
+            if len(schedule) <= A.num_rows // 4:
+                self._schedule = schedule
+                self._upper = (rows[upper], cols[upper], A.data[upper])
+                self._rhs = np.empty(A.num_rows)
+            else:
+                self._rows = (A.data, A.indices, A.indptr.tolist())
+
+    def _sweep(self, A, b, diag, x):
+        omega = self._omega
+
+        if self.ordering == 'red_black':
+            # the rows of one color are not coupled, so each color is one vectorized update
+            for rows, block, r in self._colors:
+                block.matvec(x, out=r)
+                np.subtract(b[rows], r, out=r)
+                r *= omega / diag[rows]
+                x[rows] += r
+            return
+
+        if isinstance(A, SparseMatrix) and self._schedule is not None:
+            # (D / omega + L) x_new = b - U x + (1 / omega - 1) D x
+            rows, cols, vals = self._upper
+            rhs = self._rhs
+            np.multiply((1 / omega - 1) * diag, x, out=rhs)
+            rhs += b
+            rhs -= np.bincount(rows, weights=vals * x[cols], minlength=A.num_rows)
+
+            for level, local, level_cols, level_vals in self._schedule:
+                r = rhs[level]
+                if len(level_vals):
+                    r -= np.bincount(local, weights=level_vals * x[level_cols], minlength=len(level))
+                x[level] = omega * r / diag[level]
+        elif isinstance(A, SparseMatrix):
+            data, indices, indptr = self._rows
+            for i in range(A.num_rows):
+                lo, hi = indptr[i], indptr[i + 1]
+                x[i] += omega * (b[i] - data[lo:hi] @ x[indices[lo:hi]]) / diag[i]
+        else:
+            a = A.rows
+            for i in range(A.num_rows):
+                x[i] += omega * (b[i] - a[i] @ x) / diag[i]
+
+
+class RedBlackGaussSeidelSolver(GaussSeidelSolver):
+    """
+    Gauss-Seidel method in red-black (multicolor) ordering, every color is one vectorized update
+    """
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            store_iterates=True
+    ):
+        super().__init__(criterion, eps, max_iter, store_iterates, ordering='red_black')
+
+
+class SORSolver(GaussSeidelSolver):
+    """
+    Successive over-relaxation
+
+    When omega is None, it is estimated from the spectral radius rho of the Jacobi iteration matrix
+    as omega = 2 / (1 + sqrt(1 - rho^2)), rho is found with a few power iterations.
+    """
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            store_iterates=True,
+            ordering='natural',
+            omega=None
+    ):
+        super().__init__(criterion, eps, max_iter, store_iterates, ordering, omega)
+
+    def _setup(self, A, b, diag):
+        super()._setup(A, b, diag)
+        if self.omega is None:
+            self._omega = optimal_sor_omega(A, diag)
+
+
+def _color_classes(A):
+    """
+    Split the unknowns into classes with no couplings inside a class.
+    The parity of the index is tried first, otherwise the rows are colored greedily.
+    """
+    n = A.num_rows
+    if isinstance(A, SparseMatrix):
+        rows, cols = A.row_ids, A.indices
+    else:
+        rows, cols = np.nonzero(A.rows)
+
+    # the coloring must separate couplings in both directions, so it works on A + A^T
+    rows, cols = np.concatenate((rows, cols)), np.concatenate((cols, rows))
+    order = np.argsort(rows, kind='stable')
+    rows, cols = rows[order], cols[order]
+
+    off = rows != cols
+    parity = np.arange(n) % 2
+    if not np.any(parity[rows[off]] == parity[cols[off]]):
+        return [np.flatnonzero(parity == 0), np.flatnonzero(parity == 1)]
+
+    indptr = np.searchsorted(rows, np.arange(n + 1)).tolist()
+    cols = cols.tolist()
+    color = [-1] * n
+    for i in range(n):
+        used = {color[j] for j in cols[indptr[i]:indptr[i + 1]]}
+        c = 0
+        while c in used:
+            c += 1
+        color[i] = c
+
+    color = np.array(color)
+    return [np.flatnonzero(color == c) for c in range(color.max() + 1)]
+
+
+def optimal_sor_omega(A, diag=None, n_iter=50):
+    """
+    Estimate the optimal SOR relaxation factor from the spectral radius of the Jacobi matrix
+    I - D^-1 A using power iterations. Falls back to 1 (Gauss-Seidel) when rho >= 1.
+    """
+    if diag is None:
+        diag = A.diagonal() if isinstance(A, SparseMatrix) else np.diagonal(A.rows)
+
+    v = np.random.default_rng(0).random(A.num_rows)
+    norms = []
+    for _ in range(n_iter):
+        v = v - A.matvec(v) / diag
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            return 1.0
+        v /= norm
+        norms.append(norm)
+
+    # two steps at a time, eigenvalues of the Jacobi matrix come in +-rho pairs for red-black matrices
+    rho = np.sqrt(norms[-1] * norms[-2])
+    if rho >= 1:
+        return 1.0
+
+    return float(2 / (1 + np.sqrt(1 - rho ** 2)))
+
+
+class SimpleIterationSolver(JacobiSolver):
+
+    _require_dominance = True
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            store_iterates=True
+    ):
+        super().__init__(criterion, eps, max_iter, store_iterates)
+
+    def _prepare(self, A, b):
+        # a dense factorization is out of reach for sparse systems, dominance is checked alone there
+        if not isinstance(A, SparseMatrix) and A.lu().is_singular:
+            raise ValueError('The matrix A is singular')
+
+        return super()._prepare(A, b)
+
+    def solve(self, **kwargs):
+        """
+        This method implements the Simple Iteration algorithm to solve the system of linear functions
+        Ax = b
+
+        Required keyword Arguments:
+        - A: Matrix or SparseMatrix of shape (n, n)
+        - b: Matrix of shape (n, 1)
+        """
+        return super().solve(**kwargs)
+
+
 def cramer_2d(coefficients, constants):
     coefficients_matrix = Matrix(coefficients)
     denominator = coefficients_matrix.det()
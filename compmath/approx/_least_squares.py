@@ -56,11 +56,11 @@ def quadratic_least_squares(x: np.ndarray, y: np.ndarray) -> tuple:
          [sum_x_squared, sum_x, n]]
     B = [sum_x_squared_y, sum_xy, sum_y]
 
-    coefficients = gaussian_elimination(A, B)
+    coefficients = gaussian_elimination(A, B, overwrite=True)
 
     y_approx = coefficients[0] * x ** 2 + coefficients[1] * x + coefficients[2]
 
-    return tuple(coefficients + [y_approx])
+    return tuple(coefficients) + (y_approx,)
 
 
 def cubic_least_squares(x: np.ndarray, y: np.ndarray) -> tuple:
@@ -96,14 +96,14 @@ def cubic_least_squares(x: np.ndarray, y: np.ndarray) -> tuple:
     ]
     B = [sum_x_cubed_y, sum_x_squared_y, sum_xy, sum_y]
 
-    coefficients = gaussian_elimination(A, B)
+    coefficients = gaussian_elimination(A, B, overwrite=True)
 
     y_approx = (coefficients[0] * x ** 3 +
                 coefficients[1] * x ** 2 +
                 coefficients[2] * x +
                 coefficients[3])
 
-    return tuple(coefficients + [y_approx])
+    return tuple(coefficients) + (y_approx,)
 
 
 def logarithmic_least_squares(x: np.ndarray, y: np.ndarray) -> tuple:
@@ -1,4 +1,9 @@
+from ._dual import *
 from ._derivative import *
 from ._simple_integral import *
 from ._improper_integral import *
 
+from ._adaptive import *
+from ._gauss import *
+from ._sampled import *
+from ._cubature import *
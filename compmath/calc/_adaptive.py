@@ -0,0 +1,141 @@
+import heapq
+import math
+import numpy as np
+from compmath.calc._nodes import _resolve_vectorized, _evaluate_nodes
+
+# Bisections between exact recomputations of the totals from the live intervals
+RESUM_INTERVAL = 64
+
+# Positive Kronrod nodes on [-1, 1], every second one is a Gauss node, 0 is the last
+_K15_NODES = np.array([
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.0,
+])
+_K15_WEIGHTS = np.array([
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+])
+_G7_WEIGHTS = np.array([
+    0.0,
+    0.129484966168869693270611432679082,
+    0.0,
+    0.279705391489276667901467771423780,
+    0.0,
+    0.381830050505118944950369775488975,
+    0.0,
+    0.417959183673469387755102040816327,
+])
+
+# the 15 nodes and both weight vectors over the whole [-1, 1]
+_NODES = np.concatenate((-_K15_NODES[:-1], _K15_NODES[::-1]))
+_KRONROD = np.concatenate((_K15_WEIGHTS[:-1], _K15_WEIGHTS[::-1]))
+_GAUSS = np.concatenate((_G7_WEIGHTS[:-1], _G7_WEIGHTS[::-1]))
+
+
+def _gk15(f, bounds, vectorized, executor=None, chunk_size=None):
+    """
+    Apply the G7/K15 pair to every interval of bounds, shape (k, 2).
+    The nodes of all intervals are evaluated in one call of a vectorized f or one task of
+    an executor, unless chunk_size splits them.
+    Returns the Kronrod estimates and the error estimates |K15 - G7|, both of shape (k,).
+    """
+    center = (bounds[:, 0] + bounds[:, 1]) / 2
+    half = (bounds[:, 1] - bounds[:, 0]) / 2
+    x = center[:, None] + half[:, None] * _NODES
+
+    y = _evaluate_nodes(f, x, vectorized, chunk_size or x.size, executor)
+
+    kronrod = half * (y @ _KRONROD)
+    gauss = half * (y @ _GAUSS)
+    return kronrod, np.abs(kronrod - gauss)
+
+
+def _totals(*intervals):
+    """
+    The integral and the error estimate summed exactly over lists of (-error, lo, hi, integral)
+    """
+    parts = [item for group in intervals for item in group]
+    return math.fsum(item[3] for item in parts), math.fsum(-item[0] for item in parts)
+
+
+def gauss_kronrod(f, a, b, eps=1e-2, max_evals=4194304, vectorized=False, chunk_size=None, executor=None):
+    """
+    Adaptive Gauss-Kronrod quadrature with the G7/K15 pair.
+
+    The subintervals are kept in a heap ordered by their error estimate, the worst one is
+    bisected until the total error estimate drops below eps. Both halves are evaluated
+    together, in one call of f when it is vectorized.
+
+    Args:
+    f: The integrand.
+    a, b: The limits of integration.
+    eps: Bound for the total error estimate.
+    max_evals: The budget of evaluations of f, exceeding it raises an Exception.
+    vectorized: True, False or 'auto', see the other integrators.
+    chunk_size: Nodes per call of a vectorized f or per task of the executor. By default the
+    30 nodes of a bisection are one task, a cheap integrand does not pay for splitting them.
+    executor: Optional concurrent.futures pool the bisections are evaluated by.
+
+    Returns:
+    The log in the format of simpson(): (number of subintervals, length of the last bisected
+    subinterval, integral, total error estimate).
+    """
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+
+    log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
+
+    kronrod, error = _gk15(f, np.array([[a, b]], dtype=np.float64), vectorized, executor, chunk_size)
+    evals = len(_NODES)
+    integral, inaccuracy = float(kronrod[0]), float(error[0])
+
+    heap = [(-inaccuracy, a, b, integral)]
+    # intervals too short to bisect, they keep contributing to the totals
+    retired = []
+    intervals = resummed = 1
+    log.append((1, b - a, integral, '-'))
+
+    while True:
+        # the running totals drift over many bisections, they are recomputed exactly
+        # before the stopping test and every RESUM_INTERVAL bisections
+        if inaccuracy < eps or intervals - resummed >= RESUM_INTERVAL:
+            integral, inaccuracy = _totals(heap, retired)
+            resummed = intervals
+            if inaccuracy < eps:
+                break
+
+        if not heap or evals + 2 * len(_NODES) > max_evals:
+            raise Exception('Integral diverges or required precision is too low')
+
+        neg_error, lo, hi, part = heapq.heappop(heap)
+        mid = (lo + hi) / 2
+        if not lo < mid < hi:
+            # too short to bisect in floating point, the interval keeps its error but leaves the heap
+            retired.append((neg_error, lo, hi, part))
+            continue
+
+        kronrod, error = _gk15(f, np.array([[lo, mid], [mid, hi]]), vectorized, executor, chunk_size)
+        evals += 2 * len(_NODES)
+
+        integral += float(kronrod[0] + kronrod[1]) - part
+        inaccuracy += float(error[0] + error[1]) + neg_error
+        heapq.heappush(heap, (-float(error[0]), lo, mid, float(kronrod[0])))
+        heapq.heappush(heap, (-float(error[1]), mid, hi, float(kronrod[1])))
+
+        intervals += 1
+        log.append((intervals, mid - lo, integral, inaccuracy))
+
+    if len(log) > 2:
+        log[-1] = log[-1][:2] + (integral, inaccuracy)
+    return log
@@ -0,0 +1,269 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from compmath.calc._gauss import gauss_nodes
+from compmath.calc._nodes import CHUNK_SIZE, _executor_chunk
+
+# Sobol direction numbers of dimensions 2..8 (Joe and Kuo): (degree s, coefficients a, initial m)
+_SOBOL_PARAMS = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+]
+
+_SOBOL_BITS = 32
+
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71)
+
+
+def _sobol_directions(dim):
+    """
+    Direction numbers V[d, k] of the first dim Sobol coordinates, scaled to 32 bits
+    """
+    if dim > len(_SOBOL_PARAMS) + 1:
+        raise ValueError(f'Sobol points are available up to {len(_SOBOL_PARAMS) + 1} dimensions, use Halton')
+
+    bits = _SOBOL_BITS
+    V = np.zeros((dim, bits), dtype=np.uint64)
+    V[0] = [1 << (bits - 1 - k) for k in range(bits)]
+
+    for d in range(1, dim):
+        s, a, m = _SOBOL_PARAMS[d - 1]
+        v = [m[k] << (bits - 1 - k) for k in range(s)]
+        for k in range(s, bits):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    value ^= v[k - j]
+            v.append(value)
+        V[d] = v
+
+    return V
+
+
+def _sobol(lo, hi, dim, shift):
+    """
+    Sobol points with indices lo..hi-1 in Gray code order, digitally shifted by XOR with shift
+    """
+    V = _sobol_directions(dim)
+    index = np.arange(lo, hi, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+
+    points = np.zeros((hi - lo, dim), dtype=np.uint64)
+    for k in range(_SOBOL_BITS):
+        bit = (gray >> np.uint64(k)) & np.uint64(1)
+        points ^= bit[:, None] * V[:, k]
+
+    points ^= np.asarray(shift, dtype=np.uint64)
+    return points.astype(np.float64) / 2.0 ** _SOBOL_BITS
+
+
+def _halton(lo, hi, dim, shift):
+    """
+    Halton points with indices lo..hi-1, shifted modulo 1 by shift (Cranley-Patterson rotation)
+    """
+    if dim > len(_PRIMES):
+        raise ValueError(f'Halton points are available up to {len(_PRIMES)} dimensions')
+
+    points = np.empty((hi - lo, dim))
+    for d in range(dim):
+        base = _PRIMES[d]
+        index = np.arange(lo + 1, hi + 1, dtype=np.int64)
+        value = np.zeros(hi - lo)
+        scale = 1.0 / base
+        while np.any(index):
+            value += (index % base) * scale
+            index //= base
+            scale /= base
+        points[:, d] = value
+
+    points += shift
+    points %= 1.0
+    return points
+
+
+def _evaluate_points(f, x, vectorized):
+    """
+    Values of f at the rows of x, shape (m, d). A vectorized f takes the whole (m, d) array.
+    """
+    if vectorized:
+        return np.broadcast_to(f(x), (len(x),))
+    return np.array([f(point) for point in x])
+
+
+def _qmc_batch(f, sequence, lower, side, shift, lo, hi, vectorized):
+    """
+    Sum of f over the points lo..hi-1 of one randomized sequence mapped to the box
+    """
+    points = (_sobol if sequence == 'sobol' else _halton)(lo, hi, len(lower), shift)
+    return float(np.sum(_evaluate_points(f, lower + side * points, vectorized)))
+
+
+def _box(bounds):
+    bounds = np.asarray(bounds, dtype=np.float64)
+    if bounds.ndim != 2 or bounds.shape[1] != 2:
+        raise ValueError("bounds must be a sequence of (lower, upper) pairs")
+    return bounds[:, 0], bounds[:, 1] - bounds[:, 0]
+
+
+def gauss_cubature(f, bounds, eps=1e-2, order=4, max_points=4194304, vectorized=False,
+                   chunk_size=None, executor=None):
+    """
+    Integrate f over a box with the tensor product of composite Gauss-Legendre rules.
+
+    Every side of the box is split into n equal segments with order nodes each, n doubles until
+    two successive results differ by less than eps. The number of points is (n * order)^d,
+    so this is meant for low dimensions.
+
+    Args:
+    f: The integrand, f(x) with x of shape (d,). A vectorized f takes an array of shape (m, d)
+    and returns m values.
+    bounds: (lower, upper) limits for every dimension.
+    eps: The required difference between successive results.
+    order: Gauss nodes per segment.
+    max_points: Points per level allowed, exceeding it raises an Exception.
+    chunk_size: Points per call of a vectorized f or per task of the executor.
+    executor: Optional concurrent.futures pool owned by the caller, the chunks of every level
+    are evaluated by it and summed in order.
+
+    Returns:
+    The log in the format of simpson(): (n partition, longest segment length, integral, inaccuracy).
+    """
+    lower, side = _box(bounds)
+    dim = len(lower)
+    nodes, weights = gauss_nodes('legendre', order)
+
+    n = 1
+    integral_prev = None
+
+    log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
+
+    while True:
+        if (n * order) ** dim > max_points:
+            raise Exception('Integral diverges or required precision is too low')
+
+        # the composite rule of every side: segment c maps [-1, 1] to [c, c + 1] / n
+        t = ((np.arange(n)[:, None] + (nodes + 1) / 2) / n).ravel()
+        w = np.tile(weights / (2 * n), n)
+        axes_x = [lower[d] + side[d] * t for d in range(dim)]
+        axes_w = [side[d] * w for d in range(dim)]
+
+        total = (n * order) ** dim
+        chunk = chunk_size or (CHUNK_SIZE if executor is None else _executor_chunk(total))
+        starts = range(0, total, chunk)
+
+        def grid(lo):
+            index = np.unravel_index(np.arange(lo, min(lo + chunk, total)), (n * order,) * dim)
+            x = np.column_stack([axes_x[d][index[d]] for d in range(dim)])
+            return x, np.prod([axes_w[d][index[d]] for d in range(dim)], axis=0)
+
+        integral = 0.0
+        if executor is None:
+            for lo in starts:
+                x, cell = grid(lo)
+                integral += float(cell @ _evaluate_points(f, x, vectorized))
+        else:
+            # the points of all chunks are submitted at once, the sums are added in order
+            chunks = [grid(lo) for lo in starts]
+            values = executor.map(_evaluate_points, repeat(f), [x for x, _ in chunks], repeat(vectorized))
+            for (_, cell), y in zip(chunks, values):
+                integral += float(cell @ y)
+
+        log.append((n, float(np.max(side)) / n, integral,
+                    '-' if integral_prev is None else abs(integral - integral_prev)))
+
+        if integral_prev is not None:
+            if abs(integral - integral_prev) < eps:
+                break
+
+        integral_prev = integral
+        n *= 2
+
+    return log
+
+
+def qmc_integrate(f, bounds, eps=1e-2, sequence='sobol', replicates=8, batch_size=4096,
+                  max_points=4194304, vectorized=False, workers=None, seed=None, executor=None):
+    """
+    Randomized quasi-Monte Carlo integration over a box.
+
+    replicates independently randomized copies of the sequence (a random digital shift for Sobol,
+    a random rotation modulo 1 for Halton) are extended by batch_size points per step. The
+    estimate is the mean of the replicate means and the inaccuracy is their standard error,
+    the loop stops when it drops below eps.
+
+    Args:
+    f: The integrand, as in gauss_cubature.
+    bounds: (lower, upper) limits for every dimension.
+    eps: The required standard error.
+    sequence: 'sobol' (up to 8 dimensions) or 'halton'.
+    replicates: The number of randomized copies, at least 2.
+    batch_size: Points added to every replicate per step, powers of two suit Sobol points.
+    max_points: Points per replicate allowed, exceeding it raises an Exception.
+    vectorized: Whether f takes arrays of points.
+    workers: Evaluate the batches of the replicates in a pool of this many processes,
+    f must then be picklable.
+    seed: Seed of the randomizations.
+    executor: A concurrent.futures pool to use instead of creating one for workers,
+    it is left open so it can serve other integrations.
+
+    Returns:
+    The log in the format of simpson(): (points per replicate, '-', integral, standard error).
+    """
+    if sequence not in ('sobol', 'halton'):
+        raise ValueError(f'Unknown sequence {sequence}')
+    if replicates < 2:
+        raise ValueError("At least two replicates are needed for an error estimate")
+
+    lower, side = _box(bounds)
+    dim = len(lower)
+    volume = float(np.prod(side))
+
+    rng = np.random.default_rng(seed)
+    if sequence == 'sobol':
+        _sobol_directions(dim)
+        shifts = rng.integers(0, 2 ** _SOBOL_BITS, size=(replicates, dim), dtype=np.uint64)
+    else:
+        shifts = rng.random((replicates, dim))
+
+    sums = np.zeros(replicates)
+    n = 0
+
+    log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
+
+    pool = executor
+    if pool is None and workers is not None and workers > 1:
+        pool = ProcessPoolExecutor(workers)
+    try:
+        while True:
+            if n + batch_size > max_points:
+                raise Exception('Integral diverges or required precision is too low')
+
+            args = [(f, sequence, lower, side, shifts[r], n, n + batch_size, vectorized)
+                    for r in range(replicates)]
+            if pool is None:
+                batch = [_qmc_batch(*a) for a in args]
+            else:
+                batch = list(pool.map(_qmc_batch, *zip(*args)))
+
+            # the batches only add to the per-replicate sums, so their order does not matter
+            sums += batch
+            n += batch_size
+
+            means = volume * sums / n
+            integral = float(np.mean(means))
+            error = float(np.std(means, ddof=1) / np.sqrt(replicates))
+
+            log.append((n, '-', integral, error))
+
+            if n > batch_size and error < eps:
+                break
+    finally:
+        if pool is not None and pool is not executor:
+            pool.shutdown()
+
+    return log
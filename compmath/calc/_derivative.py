@@ -1,3 +1,7 @@
+import numpy as np
+from compmath.calc._dual import Jet, _taylor
+
+
 def derivative_at_point(func, x, h=1e-6):
     return (func(x + h) - func(x - h)) / (2 * h)
 
@@ -10,3 +14,189 @@ def grad(f, point, h=1e-6):
     gradient_x = (f(point[0] + h, point[1]) - f(point[0] - h, point[1])) / (2 * h)
     gradient_y = (f(point[0], point[1] + h) - f(point[0], point[1] - h)) / (2 * h)
     return gradient_x, gradient_y
+
+
+# Default steps of the derivative modes: the central difference balances the O(h^2) truncation
+# error against rounding, Richardson extrapolation allows a longer step, the complex step has no
+# cancellation at all, 'dual' needs no step
+_STEPS = {'central': 1e-6, 'richardson': 1e-3, 'complex': 1e-20}
+_HESSIAN_STEPS = {'central': 1e-4, 'richardson': 1e-3, 'complex': 1e-4}
+
+
+def _points(points):
+    """
+    Flatten points of shape (..., n) to (k, n), returns them with the leading shape
+    """
+    x = np.asarray(points, dtype=np.float64)
+    if x.ndim == 0:
+        raise ValueError("A point must be an array of coordinates")
+    return x.reshape(-1, x.shape[-1]), x.shape[:-1]
+
+
+def _evaluate_stack(f, X, vectorized):
+    """
+    Values of f at all points of X, shape (..., n). A vectorized f takes an array of shape (K, n)
+    and returns K values (or K rows of values), otherwise f is called point by point.
+    """
+    flat = X.reshape(-1, X.shape[-1])
+    if vectorized:
+        y = np.asarray(f(flat))
+    else:
+        y = np.array([f(p) for p in flat])
+    return y.reshape(X.shape[:-1] + y.shape[1:])
+
+
+def _jet_coefficients(f, x, directions, order, vectorized):
+    """
+    Taylor coefficients of f at the points x, shape (k, n), along every row of directions.
+    Returns an array of shape (order + 1, k, number of directions) + the shape of the values of f.
+    """
+    k, n = x.shape
+    d = len(directions)
+    c = np.zeros((order + 1, k, d, n))
+    c[0] = x[:, None, :]
+    c[1] = directions
+    X = Jet(c).reshape(k * d, n)
+
+    if vectorized:
+        y = _taylor(f(X), order)
+    else:
+        y = np.stack([_taylor(f(p), order) for p in X], axis=1)
+    return y.reshape((order + 1, k, d) + y.shape[2:])
+
+
+def _first_differences(f, x, h, method, vectorized):
+    """
+    Derivatives of f along every coordinate at the points x, shape (k, n).
+    Returns an array of shape (k, n) + the shape of the values of f.
+    """
+    k, n = x.shape
+    E = np.eye(n)
+
+    if method == 'dual':
+        return _jet_coefficients(f, x, E, 1, vectorized)[1]
+
+    if method == 'complex':
+        # f(x + i h e_j) = f(x) + i h df/dx_j + O(h^2), no subtraction, so h can be tiny
+        X = x[:, None, :] + 1j * h * E
+        return _evaluate_stack(f, X, vectorized).imag / h
+
+    if method == 'central':
+        steps = np.array([h])
+    elif method == 'richardson':
+        steps = np.array([h, h / 2])
+    else:
+        raise ValueError(f'Unknown differentiation method {method}')
+
+    # all perturbed points of all steps go to f as one stack: (k, step, sign, j, n)
+    shifts = steps[:, None, None, None] * np.array([1, -1])[None, :, None, None] * E
+    y = _evaluate_stack(f, x[:, None, None, None, :] + shifts, vectorized)
+    extra = (None,) * (y.ndim - 4)
+    d = (y[:, :, 0] - y[:, :, 1]) / (2 * steps[(None, slice(None), None) + extra])
+
+    if method == 'central':
+        return d[:, 0]
+    # the O(h^2) terms cancel: D = D(h/2) + (D(h/2) - D(h)) / 3
+    return d[:, 1] + (d[:, 1] - d[:, 0]) / 3
+
+
+def gradient(f, points, h=None, method='central', vectorized=False):
+    """
+    Gradient of a scalar function of n variables.
+
+    Args:
+    f: f(x) with x of shape (n,). A vectorized f takes an array of shape (K, n), uses x[..., j]
+    for the coordinates and returns K values.
+    points: One point of shape (n,) or any array of points of shape (..., n).
+    h: The step, a default suited to the method if None.
+    method: 'central' (2n evaluations per point, error O(h^2)), 'richardson' (4n evaluations,
+    O(h^4)), 'complex' (n evaluations of f at complex points, exact up to rounding) or 'dual'
+    (n evaluations of f at Jets, exact up to rounding, f must be built from arithmetic and ufuncs).
+    vectorized: Evaluate all perturbed points of all points in one call of f.
+
+    Returns:
+    Array of shape (..., n).
+    """
+    x, shape = _points(points)
+    d = _first_differences(f, x, _STEPS.get(method) if h is None else h, method, vectorized)
+    return d.reshape(shape + (x.shape[1],))
+
+
+def jacobian(f, points, h=None, method='central', vectorized=False):
+    """
+    Jacobian matrix of f: R^n -> R^m, the arguments are those of gradient.
+    f(x) returns m values, a vectorized f returns an array of shape (K, m).
+
+    Returns:
+    Array of shape (..., m, n).
+    """
+    x, shape = _points(points)
+    d = _first_differences(f, x, _STEPS.get(method) if h is None else h, method, vectorized)
+    d = np.moveaxis(d.reshape((len(x), x.shape[1], -1)), 1, -1)
+    return d.reshape(shape + d.shape[1:])
+
+
+def _second_differences(f, x, h, vectorized):
+    """
+    Hessians at the points x, shape (k, n), from the four point formula
+    H_ij = (f(x + h e_i + h e_j) - f(x + h e_i - h e_j) - f(x - h e_i + h e_j) + f(x - h e_i - h e_j)) / 4h^2,
+    evaluated for i <= j only
+    """
+    k, n = x.shape
+    i, j = np.triu_indices(n)
+    E = np.eye(n)
+
+    signs = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]])
+    shifts = h * (signs[:, 0, None, None] * E[i] + signs[:, 1, None, None] * E[j])
+    y = _evaluate_stack(f, x[:, None, None, :] + shifts, vectorized)
+
+    H = np.empty((k, n, n))
+    H[:, i, j] = (y[:, 0] - y[:, 1] - y[:, 2] + y[:, 3]) / (4 * h * h)
+    H[:, j, i] = H[:, i, j]
+    return H
+
+
+def hessian(f, points, h=None, method='central', vectorized=False):
+    """
+    Hessian matrix of a scalar function of n variables, the arguments are those of gradient.
+
+    'central' takes 2n(n + 1) evaluations per point, 'richardson' twice as many with an O(h^4)
+    error. 'complex' differentiates the complex-step gradient by central differences,
+    2n^2 evaluations of f at complex points. 'dual' evaluates f at n(n + 1) / 2 second order
+    Jets and is exact up to rounding.
+
+    Returns:
+    Array of shape (..., n, n).
+    """
+    x, shape = _points(points)
+    n = x.shape[1]
+    h = _HESSIAN_STEPS.get(method) if h is None else h
+
+    if method == 'dual':
+        # the second coefficient along u is u^T H u / 2: 2 H_ii along 2 e_i,
+        # (H_ii + H_jj) / 2 + H_ij along e_i + e_j
+        i, j = np.triu_indices(n)
+        E = np.eye(n)
+        c = _jet_coefficients(f, x, E[i] + E[j], 2, vectorized)[2]
+        diagonal = c[:, i == j] / 2
+        H = np.empty((len(x), n, n))
+        H[:, i, j] = np.where(i == j, diagonal[:, i], c - (diagonal[:, i] + diagonal[:, j]) / 2)
+        H[:, j, i] = H[:, i, j]
+    elif method == 'central':
+        H = _second_differences(f, x, h, vectorized)
+    elif method == 'richardson':
+        coarse = _second_differences(f, x, h, vectorized)
+        fine = _second_differences(f, x, h / 2, vectorized)
+        H = fine + (fine - coarse) / 3
+    elif method == 'complex':
+        # Im f(x + i c e_i +- h e_j) / c is df/dx_i at x +- h e_j
+        c = _STEPS['complex']
+        E = np.eye(n)
+        shifts = 1j * c * E[:, None, :] + h * np.array([1, -1])[:, None, None, None] * E[None, :, :]
+        y = _evaluate_stack(f, x[:, None, None, None, :] + shifts, vectorized).imag / c
+        H = (y[:, 0] - y[:, 1]) / (2 * h)
+        H = (H + np.swapaxes(H, 1, 2)) / 2
+    else:
+        raise ValueError(f'Unknown differentiation method {method}')
+
+    return H.reshape(shape + (n, n))
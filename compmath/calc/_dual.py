@@ -0,0 +1,320 @@
+import math
+import numpy as np
+
+
+class Jet:
+    """
+    Truncated Taylor series c[0] + c[1] t + ... + c[order] t^order, forward mode automatic
+    differentiation of any order. A Jet with order 1 is a dual number.
+
+    The coefficients are stored in an array of shape (order + 1,) + shape, so one Jet carries
+    the derivatives of a whole array of points. Jets work with Python arithmetic, comparisons
+    (by value) and the elementary NumPy ufuncs. Functions that convert their argument to float,
+    such as the ones of the math module, raise TypeError.
+
+    Attributes
+    -------------
+    c: ndarray
+        Taylor coefficients, c[k] is the k-th derivative divided by k!.
+    """
+
+    def __init__(self, coefficients):
+        c = np.asarray(coefficients)
+        self.c = c.astype(np.result_type(c, np.float64), copy=False)
+
+    @classmethod
+    def variable(cls, x, order=1, direction=1.0):
+        """
+        The independent variable at the points x, moving along direction
+        """
+        x, direction = np.broadcast_arrays(np.asarray(x, dtype=np.float64), direction)
+        c = np.zeros((order + 1,) + x.shape, dtype=np.result_type(x, direction))
+        c[0] = x
+        if order:
+            c[1] = direction
+        return cls(c)
+
+    @property
+    def order(self):
+        return len(self.c) - 1
+
+    @property
+    def value(self):
+        return self.c[0]
+
+    @property
+    def shape(self):
+        return self.c.shape[1:]
+
+    @property
+    def ndim(self):
+        return self.c.ndim - 1
+
+    def derivative(self, k=1):
+        """
+        The k-th derivative along the direction of the variable
+        """
+        return self.c[k] * math.factorial(k)
+
+    def truncated(self, order):
+        return Jet(self.c[:order + 1])
+
+    def reshape(self, *shape):
+        if len(shape) == 1 and isinstance(shape[0], tuple):
+            shape = shape[0]
+        return Jet(self.c.reshape((len(self.c),) + shape))
+
+    def sum(self, axis=None, dtype=None, out=None):
+        if axis is None:
+            axis = tuple(range(1, self.c.ndim))
+        else:
+            axis = tuple(a % self.ndim + 1 for a in np.atleast_1d(axis))
+        return Jet(self.c.sum(axis=axis))
+
+    def __len__(self):
+        if not self.ndim:
+            raise TypeError("len() of a scalar Jet")
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        return Jet(self.c[(slice(None),) + key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f'Jet({self.c!r})'
+
+    def __array_ufunc__(self, ufunc, method, *inputs, out=None, **kwargs):
+        if method != '__call__' or out is not None or kwargs:
+            return NotImplemented
+        if ufunc in _UNARY:
+            value, derivative = _UNARY[ufunc]
+            return _compose(inputs[0], value, derivative)
+        if ufunc in _BINARY:
+            return _BINARY[ufunc](*inputs)
+        if ufunc in _COMPARISONS:
+            return ufunc(*[_value(v) for v in inputs])
+        return NotImplemented
+
+    def __add__(self, other):
+        return _add(self, other)
+
+    def __radd__(self, other):
+        return _add(other, self)
+
+    def __sub__(self, other):
+        return _subtract(self, other)
+
+    def __rsub__(self, other):
+        return _subtract(other, self)
+
+    def __mul__(self, other):
+        return _multiply(self, other)
+
+    def __rmul__(self, other):
+        return _multiply(other, self)
+
+    def __truediv__(self, other):
+        return _divide(self, other)
+
+    def __rtruediv__(self, other):
+        return _divide(other, self)
+
+    def __pow__(self, other):
+        return _power(self, other)
+
+    def __rpow__(self, other):
+        return _power(other, self)
+
+    def __neg__(self):
+        return Jet(-self.c)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return _absolute(self)
+
+    def __lt__(self, other):
+        return self.value < _value(other)
+
+    def __le__(self, other):
+        return self.value <= _value(other)
+
+    def __gt__(self, other):
+        return self.value > _value(other)
+
+    def __ge__(self, other):
+        return self.value >= _value(other)
+
+
+def _value(u):
+    return u.value if isinstance(u, Jet) else u
+
+
+def _coefficients(u, v):
+    """
+    Coefficient arrays of two operands, constants become Jets of the other one's order
+    and the value axes are aligned for broadcasting
+    """
+    order = min(w.order for w in (u, v) if isinstance(w, Jet))
+    cs = []
+    for w in (u, v):
+        if isinstance(w, Jet):
+            cs.append(w.c[:order + 1])
+        else:
+            w = np.asarray(w)
+            c = np.zeros((order + 1,) + w.shape, dtype=np.result_type(w, np.float64))
+            c[0] = w
+            cs.append(c)
+
+    ndim = max(c.ndim for c in cs)
+    return [c.reshape((len(c),) + (1,) * (ndim - c.ndim) + c.shape[1:]) for c in cs]
+
+
+def _add(u, v):
+    a, b = _coefficients(u, v)
+    return Jet(a + b)
+
+
+def _subtract(u, v):
+    a, b = _coefficients(u, v)
+    return Jet(a - b)
+
+
+def _multiply(u, v):
+    a, b = _coefficients(u, v)
+    return Jet([sum(a[j] * b[k - j] for j in range(k + 1)) for k in range(len(a))])
+
+
+def _divide(u, v):
+    a, b = _coefficients(u, v)
+    q = []
+    for k in range(len(a)):
+        q.append((a[k] - sum(b[j] * q[k - j] for j in range(1, k + 1))) / b[0])
+    return Jet(np.stack(np.broadcast_arrays(*q)))
+
+
+def _compose(u, value, derivative):
+    """
+    g(u) from the value g(u0) and the rule g'(u) applied to a Jet of one order less:
+    k h[k] = sum over j of j u[j] g'(u)[k - j]
+    """
+    h = [value(u.value)]
+    if u.order:
+        d = _coefficients(derivative(u.truncated(u.order - 1)), u)[0]
+        for k in range(1, u.order + 1):
+            h.append(sum(j * u.c[j] * d[k - j] for j in range(1, k + 1)) / k)
+    return Jet(np.stack(np.broadcast_arrays(*h)))
+
+
+def _power(u, v):
+    if isinstance(v, Jet):
+        # u^v = exp(v log u)
+        return np.exp(v * np.log(u))
+
+    p = np.asarray(v)
+    if not np.any(p):
+        a, _ = _coefficients(u, p)
+        c = np.zeros_like(a)
+        c[0] = 1
+        return Jet(c)
+    return _compose(u, lambda x: x ** p, lambda w: p * w ** (p - 1))
+
+
+def _absolute(u):
+    return u * np.sign(u.value)
+
+
+def _maximum(u, v):
+    a, b = _coefficients(u, v)
+    return Jet(np.where(a[0] >= b[0], a, b))
+
+
+def _minimum(u, v):
+    a, b = _coefficients(u, v)
+    return Jet(np.where(a[0] <= b[0], a, b))
+
+
+# ufunc: (function of the value, derivative as a function of a Jet)
+_UNARY = {
+    np.exp: (np.exp, np.exp),
+    np.expm1: (np.expm1, np.exp),
+    np.exp2: (np.exp2, lambda w: np.log(2) * np.exp2(w)),
+    np.log: (np.log, lambda w: 1 / w),
+    np.log2: (np.log2, lambda w: 1 / (np.log(2) * w)),
+    np.log10: (np.log10, lambda w: 1 / (np.log(10) * w)),
+    np.log1p: (np.log1p, lambda w: 1 / (1 + w)),
+    np.sqrt: (np.sqrt, lambda w: 0.5 / np.sqrt(w)),
+    np.cbrt: (np.cbrt, lambda w: 1 / (3 * np.cbrt(w) ** 2)),
+    np.sin: (np.sin, np.cos),
+    np.cos: (np.cos, lambda w: -np.sin(w)),
+    np.tan: (np.tan, lambda w: 1 + np.tan(w) ** 2),
+    np.arcsin: (np.arcsin, lambda w: 1 / np.sqrt(1 - w * w)),
+    np.arccos: (np.arccos, lambda w: -1 / np.sqrt(1 - w * w)),
+    np.arctan: (np.arctan, lambda w: 1 / (1 + w * w)),
+    np.sinh: (np.sinh, np.cosh),
+    np.cosh: (np.cosh, np.sinh),
+    np.tanh: (np.tanh, lambda w: 1 - np.tanh(w) ** 2),
+    np.arcsinh: (np.arcsinh, lambda w: 1 / np.sqrt(w * w + 1)),
+    np.arccosh: (np.arccosh, lambda w: 1 / np.sqrt(w * w - 1)),
+    np.arctanh: (np.arctanh, lambda w: 1 / (1 - w * w)),
+}
+
+_BINARY = {
+    np.add: _add,
+    np.subtract: _subtract,
+    np.multiply: _multiply,
+    np.true_divide: _divide,
+    np.power: _power,
+    np.maximum: _maximum,
+    np.minimum: _minimum,
+    np.negative: Jet.__neg__,
+    np.positive: Jet.__pos__,
+    np.absolute: _absolute,
+    np.square: lambda u: _multiply(u, u),
+    np.reciprocal: lambda u: _divide(1.0, u),
+}
+
+_COMPARISONS = (np.less, np.less_equal, np.greater, np.greater_equal, np.equal, np.not_equal,
+                np.sign, np.isfinite, np.isnan)
+
+
+def _taylor(y, order):
+    """
+    Taylor coefficients of a result of f, shape (order + 1,) + shape of y.
+    y can be a Jet, a constant or a sequence of Jets and constants.
+    """
+    if isinstance(y, Jet):
+        return y.c
+    y = np.asarray(y)
+    if y.dtype == object:
+        if not y.ndim:
+            return _taylor(y.item(), order)
+        return np.stack([_taylor(v, order) for v in y], axis=1)
+
+    c = np.zeros((order + 1,) + y.shape, dtype=np.result_type(y, np.float64))
+    c[0] = y
+    return c
+
+
+def derivatives(f, x, order=1):
+    """
+    f and its derivatives at x from one evaluation of f at a Jet.
+
+    Args:
+    f: The function, built from arithmetic and NumPy ufuncs.
+    x: A point or an array of points, f must then accept arrays.
+    order: The highest derivative.
+
+    Returns:
+    Array of shape (order + 1,) + shape of f(x): f(x), f'(x), ..., f^(order)(x).
+    Raises TypeError when f does not accept Jets.
+    """
+    c = _taylor(f(Jet.variable(x, order)), order)
+    factorials = np.array([math.factorial(k) for k in range(order + 1)], dtype=np.float64)
+    return c * factorials.reshape((-1,) + (1,) * (c.ndim - 1))
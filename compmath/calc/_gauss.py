@@ -0,0 +1,182 @@
+import os
+from functools import lru_cache
+import numpy as np
+from compmath.calc._nodes import _evaluate_nodes
+
+# Node tables kept in memory, every (kind, order, dtype) is one entry
+NODES_CACHE_SIZE = 128
+
+
+def _legendre(n, dtype):
+    """
+    Nodes and weights of the n-point Gauss-Legendre rule on [-1, 1]. All nodes are refined
+    together by Newton's method on the three-term recurrence, starting from Tricomi's estimates.
+    """
+    def derivative(x):
+        p0, p1 = np.ones_like(x), x
+        for j in range(2, n + 1):
+            p0, p1 = p1, ((2 * j - 1) * x * p1 - (j - 1) * p0) / j
+        return p1, n * (x * p1 - p0) / (x * x - 1)
+
+    k = np.arange(n, 0, -1, dtype=dtype)
+    x = np.cos(np.pi * (k - dtype(0.25)) / (n + dtype(0.5)))
+    tol = 4 * np.finfo(dtype).eps
+
+    for _ in range(100):
+        p, dp = derivative(x)
+        dx = p / dp
+        x -= dx
+        if np.max(np.abs(dx)) <= tol:
+            break
+
+    _, dp = derivative(x)
+    return x, 2 / ((1 - x * x) * dp * dp)
+
+
+def _chebyshev(n, dtype):
+    """
+    Nodes and weights of the n-point Gauss-Chebyshev rule for f(x) / sqrt(1 - x^2) on [-1, 1]
+    """
+    k = np.arange(n, 0, -1, dtype=dtype)
+    return np.cos((2 * k - 1) * np.pi / (2 * n)), np.full(n, np.pi / n, dtype=dtype)
+
+
+def _laguerre(n, dtype):
+    """
+    Nodes and weights of the n-point Gauss-Laguerre rule for exp(-x) f(x) on [0, inf).
+    The eigenvalues of the Jacobi matrix give the initial nodes, Newton polishes them.
+    """
+    k = np.arange(1, n, dtype=dtype)
+    jacobi = np.diag(2 * np.arange(n, dtype=dtype) + 1) + np.diag(k, 1) + np.diag(k, -1)
+    x = np.linalg.eigvalsh(jacobi.astype(np.float64)).astype(dtype)
+
+    def recurrence(x):
+        p0, p1 = np.ones_like(x), 1 - x
+        for j in range(1, n):
+            p0, p1 = p1, ((2 * j + 1 - x) * p1 - j * p0) / (j + 1)
+        return p0, p1
+
+    # the polynomials overflow at the far nodes of high orders, whose weights underflow anyway
+    with np.errstate(over='ignore', invalid='ignore'):
+        for _ in range(3):
+            p0, p1 = recurrence(x)
+            step = p1 / (n * (p1 - p0) / x)
+            x -= np.where(np.isfinite(step), step, 0)
+
+        # w = x / ((n + 1) L_n+1(x))^2
+        p0, p1 = recurrence(x)
+        l_next = ((2 * n + 1 - x) * p1 - n * p0) / (n + 1)
+        weights = x / ((n + 1) * l_next) ** 2
+    return x, np.nan_to_num(weights, nan=0.0)
+
+
+_RULES = {'legendre': _legendre, 'chebyshev': _chebyshev, 'laguerre': _laguerre}
+
+
+@lru_cache(maxsize=NODES_CACHE_SIZE)
+def _cached_nodes(kind, order, dtype, cache_dir):
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f'{kind}_{order}_{dtype}.npz')
+        if os.path.exists(path):
+            with np.load(path) as table:
+                nodes, weights = table['nodes'], table['weights']
+            nodes.setflags(write=False)
+            weights.setflags(write=False)
+            return nodes, weights
+
+    dtype = np.dtype(dtype)
+    # the nodes of narrow types are computed in float64 and rounded
+    work = np.promote_types(dtype, np.float64).type
+    nodes, weights = _RULES[kind](order, work)
+    nodes, weights = nodes.astype(dtype), weights.astype(dtype)
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp, nodes=nodes, weights=weights)
+        os.replace(tmp, path)
+
+    nodes.setflags(write=False)
+    weights.setflags(write=False)
+    return nodes, weights
+
+
+def gauss_nodes(kind, order, dtype=np.float64, cache_dir=None):
+    """
+    Nodes and weights of a Gauss rule, computed once per process and kept in an LRU cache.
+
+    Args:
+    kind: 'legendre' (weight 1 on [-1, 1]), 'chebyshev' (weight 1 / sqrt(1 - x^2) on [-1, 1])
+    or 'laguerre' (weight exp(-x) on [0, inf)).
+    order: The number of nodes.
+    dtype: The floating point type of the table.
+    cache_dir: Optional directory the tables are saved to and loaded from between processes.
+
+    Returns:
+    Read-only arrays (nodes, weights) of shape (order,), nodes in increasing order.
+    """
+    if kind not in _RULES:
+        raise ValueError(f'Unknown Gauss rule {kind}')
+    if order < 1 or int(order) != order:
+        raise ValueError("Order must be a positive integer")
+
+    return _cached_nodes(kind, int(order), np.dtype(dtype).name,
+                         None if cache_dir is None else os.fspath(cache_dir))
+
+
+def _mapped_rule(f, kind, a, b, order, vectorized, cache_dir, scale_weights, chunk_size, executor):
+    nodes, weights = gauss_nodes(kind, order, cache_dir=cache_dir)
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+
+    center = (a + b) / 2
+    half = (b - a) / 2
+    x = center[..., None] + half[..., None] * nodes
+    # without an executor a vectorized f is called once for all intervals
+    chunk_size = chunk_size or (None if executor is not None else x.size)
+    integral = _evaluate_nodes(f, x, vectorized, chunk_size, executor) @ weights
+    if scale_weights:
+        integral = integral * half
+
+    return float(integral) if integral.ndim == 0 else integral
+
+
+def gauss_legendre(f, a, b, order=20, vectorized=False, cache_dir=None, chunk_size=None, executor=None):
+    """
+    Integrate f over [a, b] with the order-point Gauss-Legendre rule, exact for polynomials
+    of degree 2 * order - 1.
+
+    a and b can be arrays of limits, every interval is integrated with the same cached nodes
+    and a vectorized f is called once for all of them. The result is then an array.
+    With an executor the nodes are evaluated by the pool in chunks of chunk_size.
+    """
+    return _mapped_rule(f, 'legendre', a, b, order, vectorized, cache_dir, True, chunk_size, executor)
+
+
+def gauss_chebyshev(f, a, b, order=20, vectorized=False, cache_dir=None, chunk_size=None, executor=None):
+    """
+    Integrate f(x) / sqrt((x - a) * (b - x)) over [a, b] with the order-point Gauss-Chebyshev rule,
+    f itself should be smooth. a and b can be arrays as in gauss_legendre.
+    """
+    return _mapped_rule(f, 'chebyshev', a, b, order, vectorized, cache_dir, False, chunk_size, executor)
+
+
+def gauss_laguerre(f, a=0.0, order=20, weighted=False, vectorized=False, cache_dir=None,
+                   chunk_size=None, executor=None):
+    """
+    Integrate f over [a, inf) with the order-point Gauss-Laguerre rule.
+
+    With weighted=True the integrand is exp(-(x - a)) * f(x) and f should grow slower than
+    an exponential. Otherwise f is integrated as is, which works when it decays like exp(-x).
+    a can be an array of lower limits.
+    """
+    nodes, weights = gauss_nodes('laguerre', order, cache_dir=cache_dir)
+    if not weighted:
+        # weights of the far nodes underflow to zero, their products with exp(x) stay zero
+        with np.errstate(divide='ignore'):
+            weights = np.exp(np.log(weights) + nodes)
+
+    a = np.asarray(a, dtype=np.float64)
+    chunk_size = chunk_size or (None if executor is not None else a.size * order)
+    integral = _evaluate_nodes(f, a[..., None] + nodes, vectorized, chunk_size, executor) @ weights
+    return float(integral) if integral.ndim == 0 else integral
@@ -1,22 +1,293 @@
-def _rectangle_method_integration(f, a, b, n=100):
+from collections import OrderedDict
+import weakref
+import numpy as np
+from compmath.calc._nodes import _node_sum, _resolve_vectorized, _evaluate_nodes
+
+# Probes kept for reuse by improper_integral, one per (f, a, b, vectorized). The cache holds f
+# only through a weak reference, a probe keeps f and the executor just while it is in use.
+PROBE_CACHE_SIZE = 32
+
+_probes = OrderedDict()
+
+
+def _rectangle_method_integration(f, a, b, n=100, vectorized=False, chunk_size=None, executor=None):
     a += 1e-8
     b -= 1e-8
 
     dx = (b - a) / n
-    integral = 0
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+
+    return _node_sum(f, a, dx, n, 0.0, vectorized, chunk_size, executor) * dx
+
+
+class _DoubleExponential:
+    """
+    Double exponential quadrature: the substitution x = phi(t) makes the integrand decay
+    double exponentially in t, and the trapezoid rule in t with step h = 2^-k is refined level
+    by level, every level evaluating f only at the odd multiples of h.
+
+    tanh-sinh handles endpoint singularities of a finite [a, b], exp-sinh a half-line
+    and sinh-sinh the whole real line. The nodes closer to a finite endpoint than the floating
+    point resolution are dropped, so f is never evaluated at the endpoints.
+
+    f, chunk_size and executor are not part of the cache key, the caller sets them before every
+    use and clears f and executor afterwards with release(). A sample of f that raises
+    an arithmetic error is taken as infinite, so the integral is reported divergent.
+
+    A non-integrable singularity inside (a, b) is not at a node, but the node that lands closest
+    to it outweighs all the others, and every few levels a new node lands closer still. The terms
+    of a resolved integrand spread out instead, the share of the largest one halves per level.
+    """
+
+    # the level 0 nodes are t = 0, +-1, +-2, ... up to where the terms vanish, at most T_MAX
+    T_MAX = 6
+
+    # a level is dominated when one term is more than this share of the sum of |terms|,
+    # the integral diverges when the last two levels are still dominated after MAX_LEVELS levels
+    DOMINANCE = 0.5
+    MAX_LEVELS = 8
+
+    def __init__(self, f, a, b, vectorized=False, chunk_size=None, executor=None):
+        self.f = f
+        self.a, self.b = float(a), float(b)
+        self.vectorized = vectorized
+        self.chunk_size = chunk_size
+        self.executor = executor
+
+        terms = list(self._terms(np.zeros(1)))
+        # the outermost terms show whether the transformed integrand decays at all
+        self.tail = 0.0
+        self.t_max = []
+        for side in (-1, 1):
+            k = 0
+            t_max = self.T_MAX
+            while k < self.T_MAX:
+                term = self._terms(np.array([side * (k + 1.0)]))
+                if not len(term):
+                    # the node is closer to the endpoint than the floating point resolution,
+                    # the finer levels still fill the gap up to it
+                    t_max = k + 1
+                    break
+                k += 1
+                terms.append(term[0])
+                if not abs(term[0]) > np.finfo(float).eps * np.max(np.abs(terms)):
+                    t_max = k
+                    break
+            self.tail = max(self.tail, abs(terms[-1]) if k else 0.0)
+            self.t_max.append(t_max)
+
+        self.h = 1.0
+        self.nodes = len(terms)
+        self.sum = float(np.sum(terms))
+        self.levels = [(self.nodes, self.h, self.h * self.sum)]
+        self.largest = float(np.max(np.abs(terms)))
+        self.mass = float(np.sum(np.abs(terms)))
+        self.shares = [self.largest / self.mass if self.mass else 0.0]
+
+    def _transform(self, t):
+        """
+        Nodes x = phi(t) and weights phi'(t)
+        """
+        a, b = self.a, self.b
+        u = np.pi / 2 * np.sinh(t)
+        du = np.pi / 2 * np.cosh(t)
+
+        if np.isfinite(a) and np.isfinite(b):
+            half = (b - a) / 2
+            # the distance to the nearest endpoint is computed directly to keep it accurate
+            e = np.exp(-2 * np.abs(u))
+            d = 2 * half * e / (1 + e)
+            x = np.where(t < 0, a + d, b - d)
+            return x, 4 * half * du * e / (1 + e) ** 2
+
+        with np.errstate(over='ignore'):
+            if np.isfinite(a):
+                e = np.exp(u)
+                return a + e, du * e
+            if np.isfinite(b):
+                e = np.exp(-u)
+                return b - e, du * e
+            return np.sinh(u), du * np.cosh(u)
+
+    def _terms(self, t):
+        x, w = self._transform(t)
+        inside = (x > self.a) & (x < self.b) & (w > 0) & np.isfinite(w)
+        x, w = x[inside], w[inside]
+
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            try:
+                y = _evaluate_nodes(self.f, x, self.vectorized, self.chunk_size, self.executor)
+            except (ArithmeticError, ValueError):
+                # e.g. 1 / x at the midpoint of [-1, 1]
+                y = np.full(len(x), np.inf)
+            return w * y
+
+    def release(self):
+        self.f = self.executor = None
+
+    def refine(self):
+        """
+        Add the next level, returns (number of nodes, step, integral)
+        """
+        self.h /= 2
+        left, right = self.t_max
+        t = np.concatenate((-np.arange(self.h, left, 2 * self.h)[::-1], np.arange(self.h, right, 2 * self.h)))
+        terms = self._terms(t)
+        self.nodes += len(terms)
+        self.sum += float(np.sum(terms))
+        self.levels.append((self.nodes, self.h, self.h * self.sum))
+        if len(terms):
+            self.largest = max(self.largest, float(np.max(np.abs(terms))))
+            self.mass += float(np.sum(np.abs(terms)))
+        self.shares.append(self.largest / self.mass if self.mass else 0.0)
+        return self.levels[-1]
+
+    def dominated(self):
+        """
+        Whether one of the last two levels is dominated by a single term
+        """
+        return max(self.shares[-2:]) > self.DOMINANCE
+
+    def diverges(self, tol):
+        integral = self.levels[-1][2]
+        if not np.isfinite(integral) or not self.tail <= tol * max(1.0, abs(integral)):
+            return True
+        return len(self.levels) >= self.MAX_LEVELS and self.dominated()
+
+
+def _finite_part(a, b):
+    """
+    A finite piece of [a, b] to try a vectorized call on
+    """
+    if np.isfinite(a):
+        return a, (b if np.isfinite(b) else a + 1)
+    if np.isfinite(b):
+        return b - 1, b
+    return -1.0, 1.0
+
+
+def _forget(ref):
+    for key in [key for key in _probes if key[0] is ref]:
+        del _probes[key]
+
+
+def _probe(f, a, b, vectorized=False, chunk_size=None, executor=None):
+    """
+    The double exponential quadrature of f over [a, b], shared between check_convergence
+    and improper_integral so the evaluations made for the check are not repeated.
+    The caller releases it after use.
+    """
+    try:
+        # functions that can not be weakly referenced (builtins, ufuncs) live as long as their module
+        ref = weakref.ref(f, _forget)
+    except TypeError:
+        ref = f
+    try:
+        key = (ref, float(a), float(b), vectorized)
+        hash(key)
+    except TypeError:
+        return _DoubleExponential(f, a, b, vectorized, chunk_size, executor)
+
+    if key in _probes:
+        _probes.move_to_end(key)
+        probe = _probes[key]
+        probe.f, probe.chunk_size, probe.executor = f, chunk_size, executor
+        return probe
+
+    probe = _probes[key] = _DoubleExponential(f, a, b, vectorized, chunk_size, executor)
+    if len(_probes) > PROBE_CACHE_SIZE:
+        _probes.popitem(last=False)
+    return probe
+
+
+def check_convergence(f, a, b, tol=1e-3, vectorized=False, chunk_size=None, executor=None):
+    """
+    Decide whether the integral of f over [a, b] converges, without printing anything.
+
+    The first levels of the double exponential quadrature are computed (a few dozen evaluations
+    of f). The integral is taken as divergent when the transformed integrand is not finite,
+    a sample of f raises an arithmetic error (e.g. a singularity at the midpoint of a finite
+    interval) or the outermost terms exceed tol * max(1, |integral|), i.e. the integrand does not
+    decay towards the endpoints. The levels are cached and reused by improper_integral.
+
+    While a single sample outweighs the rest of a level the check refines further, up to
+    MAX_LEVELS levels (about a thousand evaluations); if the sample still dominates, f has
+    a non-integrable singularity inside (a, b), e.g. 1 / (x - 0.3)^2 on [0, 1]. Singularities
+    only as strong as 1 / |x - c|, whose integral grows like the log of the resolution, and
+    integrable peaks much narrower than the finest level can not be told apart and are not
+    reliably detected.
+
+    tol is a ratio to the integral. It used to be an absolute bound, with the default 1e2,
+    on the difference of two rectangle-rule sums; such values are far too loose for the ratio.
+    """
+    vectorized = _resolve_vectorized(f, *_finite_part(a, b), vectorized)
+    probe = _probe(f, a, b, vectorized, chunk_size, executor)
+    try:
+        while len(probe.levels) < 3 or (probe.dominated() and len(probe.levels) < probe.MAX_LEVELS):
+            probe.refine()
+        return not probe.diverges(tol)
+    finally:
+        probe.release()
+
+
+def _levels_log(probe, eps):
+    """
+    Refine the probe until two successive levels differ by less than eps, returns the log
+    """
+    log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
+
+    integral_prev = None
+    k = 0
+    while True:
+        if k == len(probe.levels):
+            probe.refine()
+        n, h, integral = probe.levels[k]
+        k += 1
+
+        if not np.isfinite(integral):
+            raise Exception('Integral diverges')
+
+        log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
+
+        if integral_prev is not None:
+            if abs(integral - integral_prev) < eps:
+                break
+
+        integral_prev = integral
+
+        if 2 * n >= 4194304:
+            raise Exception('Integral diverges or required precision is too low')
+
+    return log
 
-    for i in range(n):
-        x = a + i * dx
-        integral += f(x) * dx
 
-    return integral
+def improper_integral(f, a, b, eps=1e-2, tol=1e-3, vectorized=False, chunk_size=None, executor=None):
+    """
+    Integrate f over [a, b] with the double exponential transformations, a and b can be
+    infinite and f may have integrable singularities at finite endpoints.
 
+    Args:
+    f: The integrand.
+    a, b: The limits of integration, -np.inf and np.inf are allowed.
+    eps: The required difference between two successive levels.
+    tol: The divergence threshold of check_convergence.
+    vectorized: True, False or 'auto', see the other integrators.
+    chunk_size: The number of nodes per call of a vectorized f or per task of the executor.
+    executor: Optional concurrent.futures pool the new nodes of every level are evaluated by.
 
-def check_convergence(f, a, b, tol=1e2):
-    integral_approx = _rectangle_method_integration(f, a, b)
-    print(integral_approx)
-    print(_rectangle_method_integration(f, a, b, n=200))
-    return abs(integral_approx - _rectangle_method_integration(f, a, b, n=200)) < tol
+    Returns:
+    The log in the format of simpson(): (number of nodes, step in t, integral, inaccuracy).
+    """
+    if a > b:
+        raise ValueError("The lower limit must not exceed the upper one")
 
+    vectorized = _resolve_vectorized(f, *_finite_part(a, b), vectorized)
+    if not check_convergence(f, a, b, tol, vectorized, chunk_size, executor):
+        raise Exception('Integral diverges')
 
+    probe = _probe(f, a, b, vectorized, chunk_size, executor)
+    try:
+        return _levels_log(probe, eps)
+    finally:
+        probe.release()
 
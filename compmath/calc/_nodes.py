@@ -0,0 +1,105 @@
+import os
+from itertools import repeat
+import numpy as np
+
+# Nodes evaluated per call of a vectorized integrand, bounds the memory of the finest levels
+CHUNK_SIZE = 2 ** 16
+
+# Tasks per CPU a level is split into when an executor is given without a chunk size
+TASKS_PER_CPU = 4
+
+
+def _resolve_vectorized(f, a, b, vectorized):
+    """
+    Decide whether f is evaluated on whole node arrays. vectorized=True or False is taken as is,
+    'auto' calls f on a few interior points at once and compares with scalar calls.
+    """
+    if vectorized != 'auto':
+        return bool(vectorized)
+
+    x = a + (b - a) * np.array([0.25, 0.5, 0.75])
+    try:
+        with np.errstate(all='ignore'):
+            y = np.asarray(f(x), dtype=np.float64)
+    except Exception:
+        return False
+
+    if y.shape not in ((), x.shape):
+        return False
+
+    y = np.broadcast_to(y, x.shape)
+    return all(np.isclose(y[i], f(x[i]), equal_nan=True) for i in range(len(x)))
+
+
+def _executor_chunk(n):
+    return max(1, -(-n // (TASKS_PER_CPU * (os.cpu_count() or 1))))
+
+
+def _sum_range(f, a, h, lo, hi, offset, vectorized):
+    """
+    Sum of f over the nodes a + (i + offset) * h, i = lo..hi-1, in one piece
+    """
+    if not vectorized:
+        total = 0
+        for i in range(lo, hi):
+            total += f(a + (i + offset) * h)
+        return total
+
+    x = np.arange(lo, hi) + offset
+    x *= h
+    x += a
+    # an integrand like lambda x: 1 returns a scalar for the whole array
+    return float(np.sum(np.broadcast_to(f(x), x.shape)))
+
+
+def _node_sum(f, a, h, n, offset=0.0, vectorized=False, chunk_size=None, executor=None):
+    """
+    Sum of f over the nodes a + (i + offset) * h, i = 0..n-1.
+
+    A vectorized f gets the nodes as arrays of at most chunk_size elements. With an executor
+    (a concurrent.futures thread or process pool) the nodes are split into chunks of chunk_size
+    evaluated by the pool, the chunk sums are added in order so the result does not depend on
+    the scheduling.
+    """
+    if executor is not None:
+        chunk_size = chunk_size or _executor_chunk(n)
+        starts = range(0, n, chunk_size)
+        ends = [min(lo + chunk_size, n) for lo in starts]
+        parts = executor.map(_sum_range, repeat(f), repeat(a), repeat(h), starts, ends,
+                             repeat(offset), repeat(vectorized))
+        total = 0
+        for part in parts:
+            total += part
+        return total
+
+    if not vectorized:
+        return _sum_range(f, a, h, 0, n, offset, vectorized)
+
+    chunk_size = chunk_size or CHUNK_SIZE
+    total = 0
+    for lo in range(0, n, chunk_size):
+        total += _sum_range(f, a, h, lo, min(lo + chunk_size, n), offset, vectorized)
+    return total
+
+
+def _evaluate_nodes(f, x, vectorized=False, chunk_size=None, executor=None):
+    """
+    Values of f at every node of the array x, a vectorized f gets chunks of at most chunk_size nodes.
+    With an executor the chunks are evaluated by the pool and put back in order.
+    """
+    flat = x.ravel()
+    if executor is not None:
+        chunk_size = chunk_size or _executor_chunk(len(flat))
+        chunks = [flat[lo:lo + chunk_size] for lo in range(0, len(flat), chunk_size)]
+        parts = list(executor.map(_evaluate_nodes, repeat(f), chunks, repeat(vectorized)))
+        return (np.concatenate(parts) if parts else np.zeros(0)).reshape(x.shape)
+
+    if not vectorized:
+        return np.array([f(t) for t in flat.tolist()], dtype=np.float64).reshape(x.shape)
+
+    chunk_size = chunk_size or CHUNK_SIZE
+    y = np.empty(flat.shape)
+    for lo in range(0, len(flat), chunk_size):
+        chunk = flat[lo:lo + chunk_size]
+        y[lo:lo + len(chunk)] = np.broadcast_to(f(chunk), chunk.shape)
+    return y.reshape(x.shape)
@@ -0,0 +1,201 @@
+import os
+import numpy as np
+
+# Samples read per step when an array or a .npy file is streamed
+SAMPLES_CHUNK_SIZE = 2 ** 20
+
+
+def _chunks(data, chunk_size):
+    """
+    Iterate over float64 chunks of an array, a path to a .npy file (memory-mapped)
+    or an iterable of chunks
+    """
+    if isinstance(data, (str, os.PathLike)):
+        data = np.load(data, mmap_mode='r')
+
+    if isinstance(data, np.ndarray):
+        chunk_size = chunk_size or SAMPLES_CHUNK_SIZE
+        for lo in range(0, len(data), chunk_size):
+            yield np.asarray(data[lo:lo + chunk_size], dtype=np.float64)
+        return
+
+    for chunk in data:
+        yield np.ravel(np.asarray(chunk, dtype=np.float64))
+
+
+def _paired(y, x, chunk_size):
+    """
+    Iterate over (y chunk, x chunk or None), the chunks of y and x must have equal lengths
+    """
+    if x is None:
+        for y_chunk in _chunks(y, chunk_size):
+            yield y_chunk, None
+        return
+
+    x_chunks = _chunks(x, chunk_size)
+    for y_chunk in _chunks(y, chunk_size):
+        x_chunk = next(x_chunks, None)
+        if x_chunk is None or len(x_chunk) != len(y_chunk):
+            raise ValueError("x and y must have the same length and be chunked the same way")
+        yield y_chunk, x_chunk
+
+
+class _Cumulative:
+    """
+    Writer of the cumulative integral into out, or into a list of pieces when out is None
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.pieces = []
+        self.size = 0
+
+    def write(self, values):
+        if self.out is None:
+            self.pieces.append(np.array(values))
+        else:
+            if self.size + len(values) > len(self.out):
+                raise ValueError("The output buffer is shorter than the data")
+            self.out[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    def result(self):
+        if self.out is None:
+            return np.concatenate(self.pieces) if self.pieces else np.zeros(0)
+        return self.out[:self.size]
+
+
+def trapezoidal_samples(y, x=None, dx=1.0, cumulative=False, out=None, chunk_size=None):
+    """
+    Integrate tabulated samples with the trapezoid rule, streaming through them once.
+
+    Args:
+    y: The samples: an array, a memory-mapped array, a path to a .npy file or an iterable of chunks.
+    x: Optional sample points of any spacing, in the same form and chunking as y.
+    dx: The spacing of the samples when x is None.
+    cumulative: Also return the integral from the first sample up to every sample.
+    out: Optional buffer for the cumulative integral, e.g. a np.memmap.
+    chunk_size: Samples per step when y (and x) are arrays or files.
+
+    Returns:
+    The integral, or (integral, cumulative integral of the same length as y) if cumulative.
+    """
+    writer = _Cumulative(out) if cumulative else None
+    integral = 0.0
+    carry_y = carry_x = None
+
+    for y_chunk, x_chunk in _paired(y, x, chunk_size):
+        if not len(y_chunk):
+            continue
+
+        if carry_y is None:
+            if writer is not None:
+                writer.write(np.zeros(1))
+            ys, xs = y_chunk, x_chunk
+        else:
+            ys = np.concatenate(([carry_y], y_chunk))
+            xs = None if x_chunk is None else np.concatenate(([carry_x], x_chunk))
+
+        h = dx if xs is None else np.diff(xs)
+        areas = h * (ys[:-1] + ys[1:]) / 2
+
+        if writer is not None:
+            writer.write(integral + np.cumsum(areas))
+        integral += float(np.sum(areas))
+
+        carry_y = ys[-1]
+        carry_x = None if xs is None else xs[-1]
+
+    if writer is not None:
+        return integral, writer.result()
+    return integral
+
+
+def _simpson_pairs(y0, y1, y2, h0, h1):
+    """
+    Simpson's rule for the pairs of intervals [x0, x1], [x1, x2] of any lengths h0, h1.
+    Returns the integrals over the pairs and over their first intervals.
+    """
+    H = h0 + h1
+    pair = H / 6 * ((2 - h1 / h0) * y0 + H * H / (h0 * h1) * y1 + (2 - h0 / h1) * y2)
+    first = h0 / 6 * ((3 - h0 / H) * y0 + (3 * H - 2 * h0) / h1 * y1 - h0 * h0 / (H * h1) * y2)
+    return pair, first
+
+
+def _simpson_last(y0, y1, y2, h0, h1):
+    """
+    The integral over the last interval [x1, x2] of the parabola through three points
+    """
+    H = h0 + h1
+    return (h1 * (2 * h1 + 3 * h0) / (6 * H) * y2 + h1 * (h1 + 3 * h0) / (6 * h0) * y1
+            - h1 ** 3 / (6 * h0 * H) * y0)
+
+
+def simpson_samples(y, x=None, dx=1.0, cumulative=False, out=None, chunk_size=None):
+    """
+    Integrate tabulated samples with Simpson's rule, streaming through them once.
+
+    Pairs of intervals are integrated with the parabola through their three points, which
+    works for non-uniform spacing as well. With an odd number of intervals the last one uses
+    the parabola through the last three points. Two samples are integrated as a trapezoid.
+    The arguments and the result are those of trapezoidal_samples.
+    """
+    writer = _Cumulative(out) if cumulative else None
+    integral = 0.0
+
+    # the samples of an unfinished pair are carried to the next chunk, prev is the one before them
+    carry_y, carry_x = np.zeros(0), np.zeros(0)
+    prev = None
+    started = False
+
+    for y_chunk, x_chunk in _paired(y, x, chunk_size):
+        if not len(y_chunk):
+            continue
+
+        if not started and writer is not None:
+            writer.write(np.zeros(1))
+        started = True
+
+        ys = np.concatenate((carry_y, y_chunk))
+        xs = None if x_chunk is None else np.concatenate((carry_x, x_chunk))
+        pairs = (len(ys) - 1) // 2
+        if pairs:
+            end = 2 * pairs + 1
+            if xs is None:
+                h0 = h1 = dx
+            else:
+                h = np.diff(xs[:end])
+                h0, h1 = h[0::2], h[1::2]
+
+            pair, first = _simpson_pairs(ys[0:end - 1:2], ys[1:end:2], ys[2:end:2], h0, h1)
+            if writer is not None:
+                totals = integral + np.cumsum(pair)
+                values = np.empty(2 * pairs)
+                values[0::2] = totals - pair + first
+                values[1::2] = totals
+                writer.write(values)
+            integral += float(np.sum(pair))
+
+            prev = (ys[end - 2], None if xs is None else xs[end - 2])
+            ys = ys[end - 1:]
+            xs = None if xs is None else xs[end - 1:]
+
+        carry_y = ys
+        carry_x = np.zeros(0) if xs is None else xs
+
+    if len(carry_y) == 2:
+        # one interval is left over
+        if prev is None:
+            h1 = dx if x is None else carry_x[1] - carry_x[0]
+            last = h1 * (carry_y[0] + carry_y[1]) / 2
+        else:
+            h0 = dx if x is None else carry_x[0] - prev[1]
+            h1 = dx if x is None else carry_x[1] - carry_x[0]
+            last = _simpson_last(prev[0], carry_y[0], carry_y[1], h0, h1)
+        integral += float(last)
+        if writer is not None:
+            writer.write(np.array([integral]))
+
+    if writer is not None:
+        return integral, writer.result()
+    return integral
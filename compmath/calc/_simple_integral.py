@@ -1,8 +1,10 @@
 from compmath.calc._improper_integral import check_convergence
+from compmath.calc._nodes import _node_sum, _resolve_vectorized
 
 
-def left_rectangles(f, a, b, eps=1e-2):
-    if not check_convergence(f, a, b):
+def left_rectangles(f, a, b, eps=1e-2, vectorized=False, chunk_size=None, executor=None):
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+    if not check_convergence(f, a, b, vectorized=vectorized, chunk_size=chunk_size, executor=executor):
         raise Exception('Integral diverges')
 
     a += 1e-6
@@ -13,15 +15,10 @@ def left_rectangles(f, a, b, eps=1e-2):
 
     log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
 
-    while True:
-        h = (b - a) / n
-        integral = 0
-
-        for i in range(n):
-            integral += f(a + i * h)
-
-        integral *= h
+    h = (b - a) / n
+    integral = h * _node_sum(f, a, h, n, 0.0, vectorized, chunk_size, executor)
 
+    while True:
         log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
 
         if integral_prev is not None:
@@ -29,16 +26,21 @@ def left_rectangles(f, a, b, eps=1e-2):
                 break
 
         integral_prev = integral
-        n *= 2
 
-        if n >= 4194304:
+        if 2 * n >= 4194304:
             raise Exception('Integral diverges or required precision is too low')
 
+        # the nodes of the finer level are the old nodes plus the midpoints of the old segments
+        integral = (integral + h * _node_sum(f, a, h, n, 0.5, vectorized, chunk_size, executor)) / 2
+        n *= 2
+        h = (b - a) / n
+
     return log
 
 
-def right_rectangles(f, a, b, eps=1e-2):
-    if not check_convergence(f, a, b):
+def right_rectangles(f, a, b, eps=1e-2, vectorized=False, chunk_size=None, executor=None):
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+    if not check_convergence(f, a, b, vectorized=vectorized, chunk_size=chunk_size, executor=executor):
         raise Exception('Integral diverges')
 
     a += 1e-6
@@ -49,15 +51,10 @@ def right_rectangles(f, a, b, eps=1e-2):
 
     log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
 
-    while True:
-        h = (b - a) / n
-        integral = 0
-
-        for i in range(n):
-            integral += f(a + (i + 1) * h)
-
-        integral *= h
+    h = (b - a) / n
+    integral = h * _node_sum(f, a, h, n, 1.0, vectorized, chunk_size, executor)
 
+    while True:
         log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
 
         if integral_prev is not None:
@@ -65,16 +62,20 @@ def right_rectangles(f, a, b, eps=1e-2):
                 break
 
         integral_prev = integral
-        n *= 2
 
-        if n >= 4194304:
+        if 2 * n >= 4194304:
             raise Exception('Integral diverges or required precision is too low')
 
+        integral = (integral + h * _node_sum(f, a, h, n, 0.5, vectorized, chunk_size, executor)) / 2
+        n *= 2
+        h = (b - a) / n
+
     return log
 
 
-def midpoint_rectangles(f, a, b, eps=1e-2):
-    if not check_convergence(f, a, b):
+def midpoint_rectangles(f, a, b, eps=1e-2, vectorized=False, chunk_size=None, executor=None):
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+    if not check_convergence(f, a, b, vectorized=vectorized, chunk_size=chunk_size, executor=executor):
         raise Exception('Integral diverges')
 
     a += 1e-6
@@ -86,14 +87,9 @@ def midpoint_rectangles(f, a, b, eps=1e-2):
     log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
 
     while True:
+        # the midpoints of a halved grid never coincide with the previous ones, nothing to reuse
         h = (b - a) / n
-        integral = 0
-
-        for i in range(n):
-            midpoint = a + (i + 0.5) * h
-            integral += f(midpoint)
-
-        integral *= h
+        integral = h * _node_sum(f, a, h, n, 0.5, vectorized, chunk_size, executor)
 
         log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
 
@@ -110,8 +106,9 @@ def midpoint_rectangles(f, a, b, eps=1e-2):
     return log
 
 
-def trapezoidal(f, a, b, eps=1e-2):
-    if not check_convergence(f, a, b):
+def trapezoidal(f, a, b, eps=1e-2, vectorized=False, chunk_size=None, executor=None):
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+    if not check_convergence(f, a, b, vectorized=vectorized, chunk_size=chunk_size, executor=executor):
         raise Exception('Integral diverges')
 
     a += 1e-6
@@ -122,16 +119,49 @@ def trapezoidal(f, a, b, eps=1e-2):
 
     log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
 
+    h = (b - a) / n
+    integral = h * ((f(a) + f(b)) / 2 + _node_sum(f, a, h, n - 1, 1.0, vectorized, chunk_size, executor))
+
     while True:
+        log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
+
+        if integral_prev is not None:
+            if abs(integral - integral_prev) < eps:
+                break
+
+        integral_prev = integral
+
+        if 2 * n >= 4194304:
+            raise Exception('Integral diverges or required precision is too low')
+
+        # T_2n = (T_n + M_n) / 2, only the midpoints are new
+        integral = (integral + h * _node_sum(f, a, h, n, 0.5, vectorized, chunk_size, executor)) / 2
+        n *= 2
         h = (b - a) / n
-        integral = 0
 
-        for i in range(n):
-            x0 = a + i * h
-            x1 = a + (i + 1) * h
-            integral += (f(x0) + f(x1)) / 2
+    return log
+
+
+def simpson(f, a, b, eps=1e-2, vectorized=False, chunk_size=None, executor=None):
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+    if not check_convergence(f, a, b, vectorized=vectorized, chunk_size=chunk_size, executor=executor):
+        raise Exception('Integral diverges')
+
+    a += 1e-6
+    b -= 1e-6
+
+    n = 2
+    integral_prev = None
+
+    log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
+
+    h = (b - a) / n
+    trapezoid = h * ((f(a) + f(b)) / 2 + _node_sum(f, a, h, n - 1, 1.0, vectorized, chunk_size, executor))
 
-        integral *= h
+    while True:
+        # S_n = (T_n + 2 M_n) / 3, the trapezoid sum of the next level is (T_n + M_n) / 2
+        midpoint = h * _node_sum(f, a, h, n, 0.5, vectorized, chunk_size, executor)
+        integral = (trapezoid + 2 * midpoint) / 3
 
         log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
 
@@ -140,7 +170,9 @@ def trapezoidal(f, a, b, eps=1e-2):
                 break
 
         integral_prev = integral
+        trapezoid = (trapezoid + midpoint) / 2
         n *= 2
+        h = (b - a) / n
 
         if n >= 4194304:
             raise Exception('Integral diverges or required precision is too low')
@@ -148,29 +180,34 @@ def trapezoidal(f, a, b, eps=1e-2):
     return log
 
 
-def simpson(f, a, b, eps=1e-2):
-    if not check_convergence(f, a, b):
+def romberg(f, a, b, eps=1e-2, vectorized=False, chunk_size=None, executor=None):
+    """
+    Romberg integration: Richardson extrapolation of the nested trapezoid sequence.
+    Row k of the table holds R[k][j] = R[k][j - 1] + (R[k][j - 1] - R[k - 1][j - 1]) / (4^j - 1),
+    the log shows the diagonal R[k][k] against the trapezoid partition it was built from.
+
+    As in the other integrators, vectorized=True calls f once per chunk of at most chunk_size
+    nodes instead of once per node, 'auto' checks whether f accepts arrays. An executor
+    (a concurrent.futures pool owned by the caller, so it persists across integrations) evaluates
+    the new nodes of every level in chunks of chunk_size, the results are added in order.
+    """
+    vectorized = _resolve_vectorized(f, a, b, vectorized)
+    if not check_convergence(f, a, b, vectorized=vectorized, chunk_size=chunk_size, executor=executor):
         raise Exception('Integral diverges')
 
     a += 1e-6
     b -= 1e-6
 
-    n = 2
+    n = 1
     integral_prev = None
 
     log = [('n partition', 'segment length', 'integral', 'inaccuracy')]
 
-    while True:
-        h = (b - a) / n
-        integral = 0
-
-        for i in range(n):
-            x0 = a + i * h
-            x1 = a + (i + 1) * h
-            x_mid = (x0 + x1) / 2
-            integral += f(x0) + 4 * f(x_mid) + f(x1)
+    h = b - a
+    row = [h * (f(a) + f(b)) / 2]
 
-        integral *= h / 6
+    while True:
+        integral = row[-1]
 
         log.append((n, h, integral, '-' if integral_prev is None else abs(integral - integral_prev)))
 
@@ -179,10 +216,15 @@ def simpson(f, a, b, eps=1e-2):
                 break
 
         integral_prev = integral
-        n *= 2
 
-        if n >= 4194304:
+        if 2 * n >= 4194304:
             raise Exception('Integral diverges or required precision is too low')
 
-    return log
+        prev_row = row
+        row = [(prev_row[0] + h * _node_sum(f, a, h, n, 0.5, vectorized, chunk_size, executor)) / 2]
+        for j in range(1, len(prev_row) + 1):
+            row.append(row[j - 1] + (row[j - 1] - prev_row[j - 1]) / (4 ** j - 1))
+        n *= 2
+        h = (b - a) / n
 
+    return log
@@ -2,8 +2,36 @@ from ._matrix import (
     Matrix
 )
 
+from ._matmul import (
+    matmul,
+    matrix_power
+)
+
+from ._sparse import (
+    SparseMatrix
+)
+
+from ._operator import (
+    LinearOperator,
+    aslinearoperator
+)
+
+from ._precond import (
+    JacobiPreconditioner,
+    ILU0Preconditioner
+)
+
+from ._lu import (
+    LUFactorization
+)
+
 from ._matfunc import (
     get_diagonally_dominant,
+    diagonally_dominant_permutation,
     is_diagonally_dominant,
     gaussian_elimination
 )
+
+from ._refinement import (
+    MixedPrecisionSolver
+)
@@ -1,73 +1,223 @@
-import itertools
-from compmath.linalg import Matrix
-
-
-def _greedy_get_diagonally_dominant(A: Matrix):
-    a = A.copy()
-    num_rows, num_cols = a.shape
-    for i in range(a.num_rows):
-        # the sum of the row without the diagonal one
-        row_sum = sum(abs(a[i][j]) for j in range(num_cols)) - abs(a[i][i])
-        if abs(a[i][i]) <= row_sum:
-            # use custom key to get argmax
-            max_col_index = max(range(a.num_cols), key=lambda j: abs(a[i][j]))
-            # swap the rows
-            for k in range(num_rows):
-                a[k][i], a[k][max_col_index] = a[k][max_col_index], a[k][i]
-
-    return a
-
-
-def get_diagonally_dominant(A: Matrix):
-    # try greedy approach
-    greedy_a = _greedy_get_diagonally_dominant(A)
-    if is_diagonally_dominant(greedy_a):
-        return greedy_a
-
-    # bruteforce doesn't make sense here
-    if A.num_cols > 10:
+from collections import deque
+import numpy as np
+from compmath.linalg import Matrix, SparseMatrix
+
+
+def _abs_diagonal_and_row_sums(A):
+    if isinstance(A, SparseMatrix):
+        return np.abs(A.diagonal()), A.abs_row_sums()
+
+    row_sums = np.empty(A.num_rows)
+    for lo, hi, block in A.row_blocks():
+        row_sums[lo:hi] = np.abs(block).sum(axis=1)
+    return np.abs(np.diagonal(A.rows)), row_sums
+
+
+def _dominance_candidates(A):
+    """
+    Build the bipartite graph rows -> columns of the positions that may go on the diagonal
+
+    Column j can be the diagonal of row i only if |a_ij| is at least half of the absolute row sum,
+    so a nonzero row has at most two candidates and an all-zero row has every column.
+    Strictly dominant candidates come first.
+    """
+    if isinstance(A, SparseMatrix):
+        values = np.abs(A.data)
+        row_sums = A.abs_row_sums()
+        # an all-zero row has every column as a candidate, as in the dense path,
+        # not only the positions it happens to store
+        mask = (2 * values >= row_sums[A.row_ids]) & (row_sums[A.row_ids] != 0)
+        zero_rows = np.flatnonzero(row_sums == 0)
+        rows = np.concatenate((A.row_ids[mask], np.repeat(zero_rows, A.num_cols)))
+        cols = np.concatenate((A.indices[mask], np.tile(np.arange(A.num_cols), len(zero_rows))))
+        values = np.concatenate((values[mask], np.zeros(len(zero_rows) * A.num_cols)))
+    else:
+        row_sums = np.empty(A.num_rows)
+        rows, cols, values = [], [], []
+        for lo, hi, block in A.row_blocks():
+            a = np.abs(block)
+            row_sums[lo:hi] = a.sum(axis=1)
+            r, c = np.nonzero(2 * a >= row_sums[lo:hi, None])
+            rows.append(r + lo)
+            cols.append(c)
+            values.append(a[r, c])
+        rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+    strict = 2 * values > row_sums[rows]
+    # the column order breaks ties, so both storages give the same graph
+    order = np.lexsort((cols, ~strict, rows))
+    indptr = np.searchsorted(rows[order], np.arange(A.num_rows + 1))
+    return indptr.tolist(), cols[order].tolist()
+
+
+def _max_bipartite_matching(indptr, adj, num_rows, num_cols):
+    """
+    Hopcroft-Karp maximum matching, returns the column matched to every row (-1 if unmatched)
+    """
+    match_row = [-1] * num_rows
+    match_col = [-1] * num_cols
+
+    # greedy initial matching
+    for r in range(num_rows):
+        for c in adj[indptr[r]:indptr[r + 1]]:
+            if match_col[c] == -1:
+                match_row[r], match_col[c] = c, r
+                break
+
+    while True:
+        # BFS layering from the free rows
+        free = [r for r in range(num_rows) if match_row[r] == -1]
+        dist = [-1] * num_rows
+        for r in free:
+            dist[r] = 0
+
+        queue = deque(free)
+        found = False
+        while queue:
+            r = queue.popleft()
+            for c in adj[indptr[r]:indptr[r + 1]]:
+                r2 = match_col[c]
+                if r2 == -1:
+                    found = True
+                elif dist[r2] == -1:
+                    dist[r2] = dist[r] + 1
+                    queue.append(r2)
+
+        if not found:
+            return match_row
+
+        # iterative DFS along the layers, augmenting vertex-disjoint shortest paths
+        ptr = indptr[:-1]
+        for root in free:
+            stack = [root]
+            while stack:
+                r = stack[-1]
+                if ptr[r] == indptr[r + 1]:
+                    dist[r] = -1
+                    stack.pop()
+                    continue
+
+                c = adj[ptr[r]]
+                ptr[r] += 1
+                r2 = match_col[c]
+                if r2 == -1:
+                    for rk in stack:
+                        ck = adj[ptr[rk] - 1]
+                        match_row[rk], match_col[ck] = ck, rk
+                    break
+                if dist[r2] == dist[r] + 1:
+                    stack.append(r2)
+
+
+def diagonally_dominant_permutation(A):
+    """
+    Find a permutation of the columns of A that makes it diagonally dominant.
+
+    The problem is solved as a perfect matching between rows and their candidate diagonal columns,
+    which takes polynomial time and proves that no permutation exists if the matching is not perfect.
+
+    Returns:
+    np.ndarray perm such that A[:, perm] is diagonally dominant, or None.
+    """
+    if is_diagonally_dominant(A):
+        return np.arange(A.num_cols)
+
+    indptr, adj = _dominance_candidates(A)
+    match_row = _max_bipartite_matching(indptr, adj, A.num_rows, A.num_cols)
+
+    if -1 in match_row:
         return None
 
-    # bruteforce approach
-    a = A.copy()
-    for permutation in itertools.permutations(range(a.num_cols)):
-        # rearrange the columns
-        new_a = Matrix([[row[i] for i in permutation] for row in a])
-        if is_diagonally_dominant(new_a):
-            return new_a
+    return np.array(match_row)
+
+
+def get_diagonally_dominant(A):
+    perm = diagonally_dominant_permutation(A)
 
     # matrix is not diagonally dominant
-    return None
+    if perm is None:
+        return None
+
+    # rearrange the columns
+    if isinstance(A, SparseMatrix):
+        return A.permute_cols(perm)
+    return Matrix(A.rows[:, perm])
 
 
-def is_diagonally_dominant(A: Matrix):
+def is_diagonally_dominant(A):
     if A.num_rows != A.num_cols:
         raise ValueError("Matrix must be square to be diagonally dominant")
 
-    f = True
-    for i in range(A.num_rows):
-        f &= A[i][i] >= sum(A[i][:]) - A[i][i]
-    return f
+    diag, row_sums = _abs_diagonal_and_row_sums(A)
+    return bool(np.all(2 * diag >= row_sums))
+
+
+def gaussian_elimination(A, B, overwrite=False):
+    """
+    Solve A x = B with row-vectorized Gaussian elimination and partial pivoting.
+
+    Args:
+    A: Matrix or array of shape (n, n), or a stack of systems of shape (m, n, n).
+    B: Right-hand sides of shape (n,) or (n, k), with a leading (m,) axis for a stack.
+    Every column of B is solved with the same elimination.
+    overwrite: Use A and B as scratch space when they are float64 arrays.
+    The solution is then written into B. A Matrix is never overwritten,
+    its cached LU factorization is reused instead.
+
+    Returns:
+    np.ndarray of the same shape as B.
+    """
+    # a Matrix keeps its factorization, so repeated solves with the same A are cheap
+    if isinstance(A, Matrix):
+        return A.solve(np.asarray(B, dtype=np.float64))
 
+    as_array = np.asarray if overwrite else np.array
+    a = as_array(A, dtype=np.float64)
+    b = as_array(B, dtype=np.float64)
 
-def gaussian_elimination(A, B):
-    n = len(B)
+    batched = a.ndim == 3
+    if not batched:
+        a = a[None]
+        b = b[None]
+    if a.ndim != 3 or a.shape[1] != a.shape[2]:
+        raise ValueError("A must have shape (n, n) or (m, n, n)")
+
+    m, n, _ = a.shape
+    if b.shape[:2] != (m, n):
+        raise ValueError("B must have as many rows as A")
+
+    vector = b.ndim == 2
+    if vector:
+        b = b[:, :, None]
+
+    batch = np.arange(m)
+    scratch = np.empty((m, n, n))
+    scratch_b = np.empty((m, n, b.shape[2]))
 
     # Forward elimination
     for i in range(n):
-        for j in range(i + 1, n):
-            factor = A[j][i] / A[i][i]
-            for k in range(i, n):
-                A[j][k] -= factor * A[i][k]
-            B[j] -= factor * B[i]
+        p = i + np.argmax(np.abs(a[:, i:, i]), axis=1)
+        a[batch, i], a[batch, p] = a[batch, p], a[batch, i]
+        b[batch, i], b[batch, p] = b[batch, p], b[batch, i]
 
-    # Back substitution
-    x = [0] * n
-    for i in range(n - 1, -1, -1):
-        x[i] = B[i] / A[i][i]
-        for j in range(i - 1, -1, -1):
-            B[j] -= A[j][i] * x[i]
+        pivot = a[:, i, i]
+        if not np.all(pivot):
+            raise ValueError('The matrix A is singular')
+
+        factors = a[:, i + 1:, i] / pivot[:, None]
+        update = scratch[:, :n - i - 1, :n - i]
+        np.multiply(factors[:, :, None], a[:, None, i, i:], out=update)
+        a[:, i + 1:, i:] -= update
 
-    return x
+        update = scratch_b[:, :n - i - 1]
+        np.multiply(factors[:, :, None], b[:, None, i], out=update)
+        b[:, i + 1:] -= update
 
+    # Back substitution
+    for i in range(n - 1, -1, -1):
+        b[:, i] -= np.einsum('mj,mjk->mk', a[:, i, i + 1:], b[:, i + 1:])
+        b[:, i] /= a[:, i, i][:, None]
 
+    if vector:
+        b = b[:, :, 0]
+    return b if batched else b[0]
@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Square products of at least this size go through the Strassen-Winograd recursion, None disables it
+STRASSEN_THRESHOLD = None
+
+# Tile size of the blocked multiplication
+BLOCK_SIZE = 512
+
+
+def matmul(a, b, method='auto', block_size=None, strassen_threshold=None, workers=None, out=None):
+    """
+    Multiply two 2d float64 arrays.
+
+    Args:
+    a, b: Arrays of shapes (n, k) and (k, m).
+    method: 'auto', 'blas', 'blocked' or 'strassen'. 'auto' picks the mat-vec kernels for
+    (n, 1) and (1, m) results, the Strassen-Winograd path above the threshold and BLAS otherwise.
+    block_size: Tile size of the blocked path, BLOCK_SIZE by default. Tiles bound the working set,
+    which matters when the operands are memory-mapped.
+    strassen_threshold: Size below which the Strassen recursion switches to BLAS,
+    STRASSEN_THRESHOLD by default.
+    workers: Split the rows of a into blocks multiplied by a pool of this many threads.
+    out: Optional preallocated result of shape (n, m).
+
+    Returns:
+    np.ndarray of shape (n, m).
+    """
+    if a.shape[1] != b.shape[0]:
+        raise ValueError(
+            "Number of columns in first matrix must be equal to the number of rows in the second matrix")
+
+    if out is None:
+        out = np.empty((a.shape[0], b.shape[1]))
+
+    if workers is not None and workers > 1 and a.shape[0] > 1:
+        bounds = np.linspace(0, a.shape[0], min(workers, a.shape[0]) + 1).astype(int)
+        with ThreadPoolExecutor(workers) as pool:
+            # numpy releases the GIL inside the kernels, so the row blocks run in parallel
+            list(pool.map(lambda lo, hi: matmul(a[lo:hi], b, method, block_size, strassen_threshold,
+                                                out=out[lo:hi]),
+                          bounds[:-1], bounds[1:]))
+        return out
+
+    if strassen_threshold is None:
+        strassen_threshold = STRASSEN_THRESHOLD
+
+    if method == 'auto':
+        if b.shape[1] == 1:
+            np.dot(a, b[:, 0], out=out[:, 0])
+            return out
+        if a.shape[0] == 1:
+            np.dot(a[0], b, out=out[0])
+            return out
+        if strassen_threshold is not None and min(a.shape + b.shape) >= strassen_threshold:
+            method = 'strassen'
+        else:
+            method = 'blas'
+
+    if method == 'blas':
+        return np.matmul(a, b, out=out)
+    if method == 'blocked':
+        return _blocked(a, b, block_size or BLOCK_SIZE, out)
+    if method == 'strassen':
+        out[...] = _strassen(a, b, strassen_threshold or 128)
+        return out
+
+    raise ValueError(f'Unknown multiplication method {method}')
+
+
+def _blocked(a, b, block_size, out):
+    n, k = a.shape
+    m = b.shape[1]
+    for i in range(0, n, block_size):
+        for j in range(0, m, block_size):
+            tile = out[i:i + block_size, j:j + block_size]
+            tile[...] = 0
+            for p in range(0, k, block_size):
+                tile += a[i:i + block_size, p:p + block_size] @ b[p:p + block_size, j:j + block_size]
+    return out
+
+
+def _strassen(a, b, threshold):
+    n, k = a.shape
+    m = b.shape[1]
+    if min(n, k, m) < threshold:
+        return a @ b
+
+    # pad odd dimensions with a zero row / column
+    if n % 2 or k % 2 or m % 2:
+        a = np.pad(a, ((0, n % 2), (0, k % 2)))
+        b = np.pad(b, ((0, k % 2), (0, m % 2)))
+        return _strassen(a, b, threshold)[:n, :m]
+
+    h, p, q = n // 2, k // 2, m // 2
+    a11, a12, a21, a22 = a[:h, :p], a[:h, p:], a[h:, :p], a[h:, p:]
+    b11, b12, b21, b22 = b[:p, :q], b[:p, q:], b[p:, :q], b[p:, q:]
+
+    # Winograd's variant: 7 products and 15 additions
+    s1 = a21 + a22
+    s2 = s1 - a11
+    s3 = a11 - a21
+    s4 = a12 - s2
+    t1 = b12 - b11
+    t2 = b22 - t1
+    t3 = b22 - b12
+    t4 = t2 - b21
+
+    p1 = _strassen(a11, b11, threshold)
+    p2 = _strassen(a12, b21, threshold)
+    p3 = _strassen(s4, b22, threshold)
+    p4 = _strassen(a22, t4, threshold)
+    p5 = _strassen(s1, t1, threshold)
+    p6 = _strassen(s2, t2, threshold)
+    p7 = _strassen(s3, t3, threshold)
+
+    u2 = p1 + p6
+    u3 = u2 + p7
+    u4 = u2 + p5
+
+    c = np.empty((n, m))
+    c[:h, :q] = p1 + p2
+    c[:h, q:] = u4 + p3
+    c[h:, :q] = u3 - p4
+    c[h:, q:] = u3 + p5
+    return c
+
+
+def matrix_power(a, p, **kwargs):
+    """
+    Raise a square array to a non-negative integer power by repeated squaring,
+    O(log p) multiplications instead of p - 1
+    """
+    if p < 0 or int(p) != p:
+        raise ValueError("Power must be a non-negative integer")
+
+    result = None
+    square = a
+    p = int(p)
+    while p:
+        if p & 1:
+            result = square.copy() if result is None else matmul(result, square, **kwargs)
+        p >>= 1
+        if p:
+            square = matmul(square, square, **kwargs)
+
+    return np.eye(a.shape[0]) if result is None else result
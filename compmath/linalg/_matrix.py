@@ -1,93 +1,235 @@
+import hashlib
+import mmap
+import tempfile
+import numpy as np
+from compmath.linalg._matmul import matmul, matrix_power
+
+# Memory-mapped matrices are processed in row blocks of about this many bytes
+STREAM_BLOCK_BYTES = 64 * 2 ** 20
+
+
+def _is_mapped(data):
+    while data is not None:
+        if isinstance(data, (np.memmap, mmap.mmap)):
+            return True
+        data = getattr(data, 'base', None)
+    return False
+
+
+def scratch_array(shape, dtype=np.float64):
+    """
+    Allocate an array backed by an anonymous temporary file instead of RAM
+    """
+    return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode='w+', shape=shape)
+
+
 class Matrix:
-    def __init__(self, rows):
-        self.rows = rows
-        self.num_rows = len(rows)
-        self.num_cols = len(rows[0])
+    """
+    Dense matrix backed by a float64 numpy array
+
+    Rows are exposed as numpy views, so `A[i][j]`, `A[i][j] = v`, iteration over rows
+    and `A.rows` work as before without copying the data.
 
-        self.shape = (self.num_rows, self.num_cols)
+    Unlike the rows of the former list of lists, `A[i]` is not an independent object: the swap
+    `A[i], A[j] = A[j], A[i]` leaves two copies of row j. Use `A.swap_rows(i, j)`, or take
+    `A[i].copy()` where a detached row is needed.
+
+    The LU factorization is computed on first use and cached. The cache is keyed
+    by a digest of the data, so writes through row views invalidate it as well.
+
+    Matrices loaded with `Matrix.load(..., mmap_mode=...)` keep their data on disk.
+    Mat-vec, the dominance checks and the LU factorization stream through them in row blocks,
+    so the resident memory stays bounded.
+    """
+
+    def __init__(self, rows):
+        data = np.asarray(rows, dtype=np.float64)
+        if data.ndim != 2:
+            raise ValueError("Matrix must be built from a two-dimensional sequence")
+
+        self._data = data
+        self._lu = None
+        self._lu_key = None
+
+    @property
+    def rows(self):
+        return self._data
+
+    @rows.setter
+    def rows(self, value):
+        self.__init__(value)
+
+    @property
+    def num_rows(self):
+        return self._data.shape[0]
+
+    @property
+    def num_cols(self):
+        return self._data.shape[1]
+
+    @property
+    def shape(self):
+        return self._data.shape
+
+    @property
+    def mapped(self):
+        return _is_mapped(self._data)
+
+    @classmethod
+    def load(cls, path, shape=None, dtype=np.float64, mmap_mode=None, offset=0):
+        """
+        Load a matrix from a .npy file or a raw binary file in row-major order.
+
+        Args:
+        path: The file to read.
+        shape: (num_rows, num_cols), required for raw files.
+        dtype: The element type of a raw file.
+        mmap_mode: None reads the file into memory. 'r', 'r+' or 'c' map it instead,
+        see numpy.memmap. Only float64 data can be mapped without a copy.
+        offset: Bytes to skip at the beginning of a raw file.
+        """
+        if str(path).endswith('.npy'):
+            data = np.load(path, mmap_mode=mmap_mode)
+        else:
+            if shape is None:
+                raise ValueError("The shape of a raw binary matrix must be given")
+            if mmap_mode is None:
+                data = np.fromfile(path, dtype=dtype, count=shape[0] * shape[1], offset=offset).reshape(shape)
+            else:
+                data = np.memmap(path, dtype=dtype, mode=mmap_mode, shape=tuple(shape), offset=offset)
+
+        return cls(data)
+
+    def save(self, path):
+        """
+        Save the matrix to a .npy file, or as raw float64 row-major binary for other extensions.
+        The data is written in row blocks, so memory-mapped matrices are not loaded entirely.
+        """
+        if str(path).endswith('.npy'):
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=self.shape)
+            for lo, hi, block in self.row_blocks():
+                out[lo:hi] = block
+            out.flush()
+            return
+
+        with open(path, 'wb') as f:
+            for _, _, block in self.row_blocks():
+                np.ascontiguousarray(block).tofile(f)
+
+    def row_blocks(self, block_rows=None):
+        """
+        Iterate over (first row, end row, view of the rows) in blocks of rows
+        """
+        if block_rows is None:
+            block_rows = max(1, STREAM_BLOCK_BYTES // (8 * max(self.num_cols, 1)))
+        for lo in range(0, self.num_rows, block_rows):
+            hi = min(lo + block_rows, self.num_rows)
+            yield lo, hi, self._data[lo:hi]
+
+    def permute_rows(self, order):
+        """
+        Return the matrix whose row i is row order[i] of this one.
+        For a memory-mapped matrix the result is written to a temporary file.
+        """
+        order = np.asarray(order, dtype=np.intp)
+        if not self.mapped:
+            return Matrix(self._data[order])
+
+        out = scratch_array((len(order), self.num_cols))
+        block_rows = max(1, STREAM_BLOCK_BYTES // (8 * max(self.num_cols, 1)))
+        for lo in range(0, len(order), block_rows):
+            rows = order[lo:lo + block_rows]
+            # read the source rows in file order
+            by_position = np.argsort(rows)
+            out[lo + by_position] = self._data[rows[by_position]]
+        return Matrix(out)
+
+    def swap_rows(self, i, j):
+        """
+        Exchange rows i and j in place
+        """
+        self._data[[i, j]] = self._data[[j, i]]
+        self._lu = None
 
     def __add__(self, other):
-        if self.num_rows != other.num_rows or self.num_cols != other.num_cols:
+        if self.shape != other.shape:
             raise ValueError("Matrices must have the same dimensions for addition")
 
-        result = [[self[i][j] + other[i][j] for j in range(self.num_cols)] for i in range(self.num_rows)]
-        return Matrix(result)
+        return Matrix(self._data + other._data)
 
     def __sub__(self, other):
-        if self.num_rows != other.num_rows or self.num_cols != other.num_cols:
+        if self.shape != other.shape:
             raise ValueError("Matrices must have the same dimensions for subtraction")
 
-        result = [[self[i][j] - other[i][j] for j in range(self.num_cols)] for i in range(self.num_rows)]
-        return Matrix(result)
+        return Matrix(self._data - other._data)
 
     def __mul__(self, other):
         if self.num_cols != other.num_rows:
             raise ValueError(
                 "Number of columns in first matrix must be equal to the number of rows in the second matrix")
 
-        result = [[0] * other.num_cols for _ in range(self.num_rows)]
+        return Matrix(matmul(self._data, other._data))
 
-        for i in range(self.num_rows):
-            for j in range(other.num_cols):
-                for k in range(self.num_cols):
-                    result[i][j] += self.rows[i][k] * other[k][j]
+    def matvec(self, x, out=None):
+        """
+        Compute A * x for x of shape (num_cols,) or (num_cols, k)
+        """
+        if not self.mapped:
+            return np.matmul(self._data, x, out=out)
 
-        return Matrix(result)
+        if out is None:
+            out = np.empty((self.num_rows,) + np.shape(x)[1:])
+        for lo, hi, block in self.row_blocks():
+            np.matmul(block, x, out=out[lo:hi])
+        return out
 
     def __pow__(self, p):
         if self.num_rows != self.num_cols:
             raise ValueError("Matrix must be square for exponentiation")
 
-        if p == 0:
-            return Matrix([[1 if i == j else 0 for j in range(self.num_rows)] for i in range(self.num_rows)])
+        return Matrix(matrix_power(self._data, p))
+
+    def _fingerprint(self):
+        # read-only data (e.g. a file mapped with mode 'r') can not change behind our back
+        if not self._data.flags.writeable:
+            return self.shape, None
 
-        result = self
-        for _ in range(p - 1):
-            result = result * self
+        digest = hashlib.blake2b(digest_size=16)
+        for _, _, block in self.row_blocks():
+            digest.update(np.ascontiguousarray(block).data)
+        return self.shape, digest.digest()
 
-        return result
+    def lu(self):
+        """
+        Return the LU factorization of the matrix, computing it only if the data changed
+        """
+        from compmath.linalg._lu import LUFactorization
+
+        key = self._fingerprint()
+        if self._lu is None or self._lu_key != key:
+            self._lu = LUFactorization(self)
+            self._lu_key = key
+
+        return self._lu
 
     def upper_triangular(self):
-        matrix = self.copy()
-        row_swaps = 0
-
-        for i in range(self.num_rows):
-            # Find the maximum element in the current column below the diagonal
-            max_row = i
-            for j in range(i + 1, self.num_rows):
-                if abs(matrix[j][i]) > abs(matrix[max_row][i]):
-                    max_row = j
-
-            # Swap the rows to ensure the maximum element is on the diagonal
-            if max_row != i:
-                matrix[i], matrix[max_row] = matrix[max_row], matrix[i]
-                row_swaps += 1
-
-            # Make the elements below the diagonal zero
-            for j in range(i + 1, self.num_rows):
-                try:
-                    factor = -matrix[j][i] / matrix[i][i]
-                except ZeroDivisionError:
-                    factor = 0
-                for k in range(i, self.num_rows):
-                    matrix[j][k] += factor * matrix[i][k]
-
-        return matrix, row_swaps
+        lu = self.lu()
+        return Matrix(np.triu(lu._lu)), lu.swaps
 
     def det(self):
         if self.num_rows != self.num_cols:
             raise ValueError("Matrix must be square to compute determinant")
 
-        # Make the matrix upper triangular
-        upper_triangular_matrix, row_swaps = self.upper_triangular()
+        return self.lu().det()
 
-        # Compute the determinant as the product of diagonal elements
-        d_sign = (-1) ** row_swaps
-        d = 1
-        for i in range(self.num_rows):
-            d *= upper_triangular_matrix[i][i]
+    def solve(self, b):
+        return self.lu().solve(b)
+
+    def inverse(self):
+        if self.num_rows != self.num_cols:
+            raise ValueError("Matrix must be square to compute the inverse")
 
-        return d * d_sign
+        return self.lu().inverse()
 
     def det_slow(self):
         if self.num_rows != self.num_cols:
@@ -99,28 +241,31 @@ class Matrix:
         d = 0
         for j in range(self.num_cols):
             sign = (-1) ** j
-            sub_matrix = [row[:j] + row[j + 1:] for row in self.rows[1:]]
+            sub_matrix = np.delete(self._data[1:], j, axis=1)
             d += sign * self[0][j] * Matrix(sub_matrix).det_slow()
 
         return d
 
     def __getitem__(self, index):
-        return self.rows[index]
+        return self._data[index]
 
     def __setitem__(self, index, value):
-        self.rows[index] = value
+        self._data[index] = value
+        self._lu = None
 
     def __eq__(self, other):
-        return self.rows == other.rows
+        return np.array_equal(self._data, other._data)
 
     def __str__(self):
-        return '\n'.join([' '.join(map(str, row)) for row in self.rows])
+        return '\n'.join([' '.join(map(str, row)) for row in self._data.tolist()])
 
     def __len__(self):
         return self.num_rows
 
     def __iter__(self):
-        return iter(self.rows)
+        return iter(self._data)
 
     def copy(self):
-        return Matrix([row[:] for row in self.rows])
+        matrix = Matrix(self._data.copy())
+        matrix._lu, matrix._lu_key = self._lu, self._lu_key
+        return matrix
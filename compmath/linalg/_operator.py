@@ -0,0 +1,89 @@
+import numpy as np
+from compmath.linalg._matrix import Matrix
+from compmath.linalg._sparse import SparseMatrix
+
+
+class LinearOperator:
+    """
+    Matrix-free linear operator, only the action x -> A * x is known
+
+    Attributes
+    -------------
+
+    shape: tuple -- (num_rows, num_cols)
+
+    matvec: callable -- x -> A * x
+
+    rmatvec: callable, optional -- x -> A^T * x
+
+    diagonal: callable, optional -- () -> the diagonal of A, used by the Jacobi preconditioner
+
+    """
+
+    def __init__(self, shape, matvec, rmatvec=None, diagonal=None):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self._matvec = matvec
+        self._rmatvec = rmatvec
+        self._diagonal = diagonal
+
+    @property
+    def num_rows(self):
+        return self.shape[0]
+
+    @property
+    def num_cols(self):
+        return self.shape[1]
+
+    def matvec(self, x, out=None):
+        y = np.asarray(self._matvec(x), dtype=np.float64)
+        if out is None:
+            return y
+        out[...] = y
+        return out
+
+    def rmatvec(self, x, out=None):
+        if self._rmatvec is None:
+            raise ValueError("The operator does not provide a transposed mat-vec")
+
+        y = np.asarray(self._rmatvec(x), dtype=np.float64)
+        if out is None:
+            return y
+        out[...] = y
+        return out
+
+    def diagonal(self):
+        if self._diagonal is None:
+            raise ValueError("The operator does not provide its diagonal")
+
+        return np.asarray(self._diagonal(), dtype=np.float64)
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self.matvec(other.rows))
+        return self.matvec(other)
+
+    def __matmul__(self, other):
+        return self.matvec(other.rows if isinstance(other, Matrix) else other)
+
+
+def aslinearoperator(A):
+    """
+    Wrap a Matrix, a SparseMatrix, a 2d array or any object with `shape` and `matvec`
+    into a LinearOperator
+    """
+    if isinstance(A, LinearOperator):
+        return A
+
+    if isinstance(A, np.ndarray):
+        A = Matrix(A)
+
+    if isinstance(A, Matrix):
+        return LinearOperator(A.shape, A.matvec, lambda x: A.rows.T @ x, lambda: np.diagonal(A.rows))
+
+    if isinstance(A, SparseMatrix):
+        return LinearOperator(A.shape, A.matvec, A.rmatvec, A.diagonal)
+
+    if hasattr(A, 'matvec') and hasattr(A, 'shape'):
+        return LinearOperator(A.shape, A.matvec, getattr(A, 'rmatvec', None), getattr(A, 'diagonal', None))
+
+    raise TypeError(f'Can not use {type(A).__name__} as a linear operator')
@@ -0,0 +1,133 @@
+import numpy as np
+from compmath.linalg._matrix import Matrix
+from compmath.linalg._sparse import SparseMatrix
+from compmath.linalg._operator import LinearOperator
+
+
+class JacobiPreconditioner:
+    """
+    Diagonal preconditioner M = diag(A)
+    """
+
+    def __init__(self, A):
+        diag = np.diagonal(A.rows) if isinstance(A, Matrix) else A.diagonal()
+        if not np.all(diag):
+            raise ValueError("Jacobi preconditioner needs a nonzero diagonal")
+
+        self.inv_diag = 1 / diag
+
+    def apply(self, r, out=None):
+        return np.multiply(r, self.inv_diag, out=out)
+
+
+class ILU0Preconditioner:
+    """
+    Incomplete LU factorization with zero fill-in: L and U keep the sparsity pattern of A.
+
+    The triangular solves are level-scheduled: rows are grouped so that a row only depends on
+    rows of earlier groups, and every group is solved as one vectorized update.
+    A dense Matrix has a full pattern, so its exact (cached) LU factorization is used instead.
+    """
+
+    def __init__(self, A):
+        if isinstance(A, Matrix):
+            self._lu = A.lu()
+            return
+
+        if isinstance(A, LinearOperator) or not isinstance(A, SparseMatrix):
+            raise TypeError("ILU(0) needs the entries of the matrix, a Matrix or a SparseMatrix")
+
+        self._lu = None
+        n = A.num_rows
+
+        # the factorization below needs sorted column indices in every row
+        order = np.lexsort((A.indices, A.row_ids))
+        row_ids, indices = A.row_ids[order], A.indices[order]
+        indptr = A.indptr.tolist()
+        cols = indices.tolist()
+        data = A.data[order].tolist()
+
+        diag_pos = [-1] * n
+        for i in range(n):
+            lo, hi = indptr[i], indptr[i + 1]
+            pos = {c: p for p, c in enumerate(cols[lo:hi], lo)}
+
+            for p in range(lo, hi):
+                k = cols[p]
+                if k >= i:
+                    break
+
+                data[p] /= data[diag_pos[k]]
+                a_ik = data[p]
+                # subtract a_ik * (row k of U), dropping everything outside the pattern of row i
+                for q in range(diag_pos[k] + 1, indptr[k + 1]):
+                    t = pos.get(cols[q])
+                    if t is not None:
+                        data[t] -= a_ik * data[q]
+
+            if i not in pos or data[pos[i]] == 0:
+                raise ValueError(f'Zero pivot in row {i}, ILU(0) does not exist')
+            diag_pos[i] = pos[i]
+
+        data = np.array(data)
+        lower = row_ids > indices
+        upper = row_ids < indices
+
+        self.diag = data[np.array(diag_pos, dtype=np.intp)]
+        self._lower = _level_schedule(n, row_ids[lower], indices[lower], data[lower], reverse=False)
+        self._upper = _level_schedule(n, row_ids[upper], indices[upper], data[upper], reverse=True)
+
+    def apply(self, r, out=None):
+        if self._lu is not None:
+            x = self._lu.solve(r)
+        else:
+            x = np.array(r, dtype=np.float64)
+
+            # forward substitution with the unit lower factor
+            for rows, local, cols, vals in self._lower:
+                x[rows] -= np.bincount(local, weights=vals * x[cols], minlength=len(rows))
+
+            # back substitution with the upper factor
+            for rows, local, cols, vals in self._upper:
+                if len(vals):
+                    x[rows] -= np.bincount(local, weights=vals * x[cols], minlength=len(rows))
+                x[rows] /= self.diag[rows]
+
+        if out is None:
+            return x
+        out[...] = x
+        return out
+
+
+def _level_schedule(n, rows, cols, vals, reverse):
+    """
+    Group the rows of a triangular factor given as (rows, cols, vals) into dependency levels.
+    Returns a list of (level rows, local row index of every entry, entry columns, entry values).
+    """
+    indptr = np.searchsorted(rows, np.arange(n + 1)).tolist()
+    deps = cols.tolist()
+
+    level = [0] * n
+    for i in (range(n - 1, -1, -1) if reverse else range(n)):
+        lo, hi = indptr[i], indptr[i + 1]
+        if lo < hi:
+            level[i] = 1 + max(level[j] for j in deps[lo:hi])
+
+    level = np.array(level, dtype=np.intp)
+    row_order = np.argsort(level, kind='stable')
+    row_bounds = np.searchsorted(level[row_order], np.arange(level.max() + 2))
+
+    # position of every row inside its level
+    local = np.empty(n, dtype=np.intp)
+    local[row_order] = np.arange(n) - row_bounds[level[row_order]]
+
+    entry_order = np.argsort(level[rows], kind='stable')
+    entry_bounds = np.searchsorted(level[rows][entry_order], np.arange(level.max() + 2))
+    rows, cols, vals = rows[entry_order], cols[entry_order], vals[entry_order]
+
+    schedule = []
+    for l in range(level.max() + 1):
+        e = slice(entry_bounds[l], entry_bounds[l + 1])
+        schedule.append((row_order[row_bounds[l]:row_bounds[l + 1]], local[rows[e]], cols[e], vals[e]))
+
+    return schedule
@@ -0,0 +1,96 @@
+import numpy as np
+from compmath.linalg._matrix import Matrix
+from compmath.linalg._lu import LUFactorization
+from compmath._base import BasicSolver
+
+
+class MixedPrecisionSolver(BasicSolver):
+    """
+    Mixed-precision iterative refinement for dense systems Ax = b
+
+    A is factorized once in float32, which halves the memory traffic of the elimination.
+    The float64 solution is then refined with float64 residuals r = b - A x computed through
+    Matrix.matvec, every correction being solved with the float32 factors. When the corrections
+    stop shrinking (A is too ill-conditioned for float32) or turn non-finite, the solver falls back
+    to the cached float64 factorization A.lu() for the last step.
+
+    Attributes
+    -------------
+
+    stall_ratio: float, optional (default=0.5) -- Refinement is considered stalled when the
+    criterion decreases by less than this factor in one step
+
+    used_fallback: bool -- Whether the last solve() call needed the float64 factorization
+
+    """
+
+    def __init__(
+            self,
+            criterion='abs_deviation',
+            eps=1e-6,
+            max_iter=100,
+            stall_ratio=0.5
+    ):
+        super().__init__(criterion, eps, max_iter)
+        self.stall_ratio = stall_ratio
+        self.used_fallback = False
+
+    def solve(self, **kwargs):
+        """
+        Solve the system of linear equations Ax = b
+
+        Required keyword Arguments:
+        - A: Matrix or 2d array of shape (n, n)
+        - b: Matrix of shape (n, 1) or array of shape (n,)
+
+        Returns the log [(x_0, '-'), (x_1, d_1), ...] with every x of shape (n, 1),
+        x_0 being the float32 solution
+        """
+        A = kwargs['A']
+        A = A if isinstance(A, Matrix) else Matrix(A)
+        b = kwargs['b']
+        b = np.ravel(b.rows if isinstance(b, Matrix) else b).astype(np.float64)
+        self.used_fallback = False
+
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            lu = LUFactorization(A, dtype=np.float32)
+        if lu.is_singular:
+            # the matrix may be singular only after rounding to float32
+            self.used_fallback = True
+            x = A.lu().solve(b)
+            return [(x[:, None], '-')]
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            x = lu.solve(b).astype(np.float64)
+        res = [(x[:, None].copy(), '-')]
+
+        check = self._bind_criterion(A, b, len(x))
+        r = A.matvec(x)
+        np.subtract(b, r, out=r)
+        prev = np.empty_like(x)
+        d_prev = np.inf
+        for _ in range(self.max_iter):
+            prev[:] = x
+            with np.errstate(over='ignore', invalid='ignore'):
+                x += lu.solve(r)
+
+            # the residual of the new iterate serves the criterion and the next correction
+            A.matvec(x, out=r)
+            np.subtract(b, r, out=r)
+            d = check(prev, x, r) if np.all(np.isfinite(x)) else np.inf
+
+            if d < self.eps:
+                res.append((x[:, None].copy(), d))
+                break
+
+            if not d <= self.stall_ratio * d_prev:
+                # refinement does not converge in float32, finish with a float64 factorization
+                self.used_fallback = True
+                x = A.lu().solve(b)
+                res.append((x[:, None].copy(), check(prev, x)))
+                break
+
+            res.append((x[:, None].copy(), d))
+            d_prev = d
+
+        return res
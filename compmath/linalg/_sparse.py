@@ -0,0 +1,174 @@
+import numpy as np
+from compmath.linalg._matrix import Matrix
+
+
+class SparseMatrix:
+    """
+    Sparse matrix stored in compressed sparse row (CSR) format
+
+    Attributes
+    -------------
+
+    data: np.ndarray -- The nonzero values, row by row
+
+    indices: np.ndarray -- The column index of every value in data
+
+    indptr: np.ndarray -- Row i occupies data[indptr[i]:indptr[i + 1]]
+
+    shape: tuple -- (num_rows, num_cols)
+
+    Methods
+    -------------
+
+    from_coo(), from_dense(), matvec(), rmatvec(), diagonal(), abs_row_sums(), to_dense()
+
+    """
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = np.asarray(data, dtype=np.float64)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.shape = (int(shape[0]), int(shape[1]))
+
+        if len(self.indptr) != self.shape[0] + 1 or len(self.data) != len(self.indices):
+            raise ValueError("Inconsistent CSR arrays")
+
+        self._row_ids = None
+
+    @classmethod
+    def from_coo(cls, rows, cols, values, shape=None):
+        """
+        Build a matrix from (row, col, value) triplets, duplicated positions are summed
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        values = np.asarray(values, dtype=np.float64)
+
+        if shape is None:
+            shape = (int(rows.max()) + 1 if len(rows) else 0, int(cols.max()) + 1 if len(cols) else 0)
+
+        order = np.lexsort((cols, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+
+        # merge duplicated positions
+        if len(rows):
+            starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+            values = np.add.reduceat(values, starts)
+            rows, cols = rows[starts], cols[starts]
+
+        indptr = np.searchsorted(rows, np.arange(shape[0] + 1))
+        return cls(values, cols, indptr, shape)
+
+    @classmethod
+    def from_dense(cls, A):
+        a = A.rows if isinstance(A, Matrix) else np.asarray(A, dtype=np.float64)
+        rows, cols = np.nonzero(a)
+        return cls.from_coo(rows, cols, a[rows, cols], a.shape)
+
+    @property
+    def num_rows(self):
+        return self.shape[0]
+
+    @property
+    def num_cols(self):
+        return self.shape[1]
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @property
+    def row_ids(self):
+        # row index of every stored value, computed once
+        if self._row_ids is None:
+            self._row_ids = np.repeat(np.arange(self.num_rows), np.diff(self.indptr))
+        return self._row_ids
+
+    def matvec(self, x, out=None):
+        """
+        Compute A * x for x of shape (num_cols,) or (num_cols, k)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.shape[0] != self.num_cols:
+            raise ValueError("Dimension mismatch in sparse mat-vec")
+
+        if x.ndim == 1:
+            y = np.bincount(self.row_ids, weights=self.data * x[self.indices], minlength=self.num_rows)
+        else:
+            y = np.column_stack([self.matvec(x[:, j]) for j in range(x.shape[1])])
+
+        if out is None:
+            return y
+        out[...] = y
+        return out
+
+    def rmatvec(self, x, out=None):
+        """
+        Compute A^T * x for x of shape (num_rows,) or (num_rows, k)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.shape[0] != self.num_rows:
+            raise ValueError("Dimension mismatch in sparse transposed mat-vec")
+
+        if x.ndim == 1:
+            y = np.bincount(self.indices, weights=self.data * x[self.row_ids], minlength=self.num_cols)
+        else:
+            y = np.column_stack([self.rmatvec(x[:, j]) for j in range(x.shape[1])])
+
+        if out is None:
+            return y
+        out[...] = y
+        return out
+
+    def diagonal(self):
+        mask = self.row_ids == self.indices
+        diag = np.zeros(min(self.shape))
+        np.add.at(diag, self.indices[mask], self.data[mask])
+        return diag
+
+    def abs_row_sums(self):
+        return np.bincount(self.row_ids, weights=np.abs(self.data), minlength=self.num_rows)
+
+    def permute_rows(self, order):
+        """
+        Return the matrix whose row i is row order[i] of this one,
+        order may also select a subset of the rows
+        """
+        order = np.asarray(order, dtype=np.intp)
+        counts = np.diff(self.indptr)[order]
+        indptr = np.r_[0, np.cumsum(counts)]
+        src = np.repeat(self.indptr[order] - indptr[:-1], counts) + np.arange(indptr[-1])
+        return SparseMatrix(self.data[src], self.indices[src], indptr, (len(order), self.num_cols))
+
+    def permute_cols(self, perm):
+        """
+        Return the matrix whose column i is column perm[i] of this one
+        """
+        new_index = np.empty(self.num_cols, dtype=np.intp)
+        new_index[np.asarray(perm, dtype=np.intp)] = np.arange(self.num_cols)
+        return SparseMatrix(self.data, new_index[self.indices], self.indptr, self.shape)
+
+    @property
+    def T(self):
+        return SparseMatrix.from_coo(self.indices, self.row_ids, self.data, self.shape[::-1])
+
+    def to_dense(self):
+        a = np.zeros(self.shape)
+        np.add.at(a, (self.row_ids, self.indices), self.data)
+        return Matrix(a)
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self.matvec(other.rows))
+        if np.isscalar(other):
+            return SparseMatrix(self.data * other, self.indices, self.indptr, self.shape)
+        return self.matvec(other)
+
+    def __matmul__(self, other):
+        return self.matvec(other.rows if isinstance(other, Matrix) else other)
+
+    def __len__(self):
+        return self.num_rows
+
+    def __str__(self):
+        return f'SparseMatrix(shape={self.shape}, nnz={self.nnz})'
@@ -5,6 +5,12 @@ from ._equation import (
     newton_method,
 )
 
+from ._batched import (
+    bin_search_batch,
+    chord_method_batch,
+    newton_method_batch,
+)
+
 from ._nle import *
 
 from ._sonle import (
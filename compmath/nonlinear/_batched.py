@@ -0,0 +1,164 @@
+import numpy as np
+from compmath.nonlinear._equation import _taylor_of, _newton_step, _illinois_step
+
+
+def _lanes(f, a, b, args):
+    """
+    Flatten the brackets and the parameters of f to lanes.
+    Returns a, b, f(a), f(b), the parameters and the shape of the batch.
+    """
+    a, b, *args = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), *args)
+    shape = a.shape
+    a, b = a.ravel(), b.ravel()
+    args = [np.ravel(p) for p in args]
+
+    with np.errstate(all='ignore'):
+        fa = np.broadcast_to(f(a, *args), a.shape).astype(np.float64)
+        fb = np.broadcast_to(f(b, *args), b.shape).astype(np.float64)
+    return a, b, fa, fb, args, shape
+
+
+def _start(a, b, fa, fb):
+    """
+    The roots, the convergence flags and the lanes to iterate on. A bracket needs
+    f(a) * f(b) <= 0, an end where f is exactly zero is its root.
+    """
+    x = np.full(a.shape, np.nan)
+    at_a = fa == 0
+    at_b = (fb == 0) & ~at_a
+    x[at_a], x[at_b] = a[at_a], b[at_b]
+    return x, at_a | at_b, np.flatnonzero(fa * fb < 0)
+
+
+def _compact(keep, arrays):
+    return [v[keep] for v in arrays]
+
+
+def bin_search_batch(f, a, b, eps=1e-6, max_iter=100, args=()):
+    """
+    Solve f(x, *args) = 0 by bisection on every bracket [a, b] at once.
+
+    The brackets run in lockstep, every iteration evaluates f once on the midpoints of the
+    unfinished ones only. A bracket is finished when |f(m)| < eps, as in bin_search.
+
+    Args:
+    f: The function, f(x, *args) with x and args arrays of the same shape.
+    a, b: Arrays of the ends of the brackets, broadcast against each other and args.
+    eps: Tolerance for stopping criterion (default: 1e-6).
+    max_iter: Maximum number of iterations (default: 100).
+    args: Parameters of f, arrays broadcast against a and b, one value per bracket.
+
+    Returns:
+    (roots, converged), arrays of the shape of the batch. Brackets with f(a) * f(b) > 0
+    have the root nan, the unconverged ones keep their last midpoint.
+    """
+    a, b, fa, fb, args, shape = _lanes(f, a, b, args)
+    x, converged, active = _start(a, b, fa, fb)
+    a, b, fa = _compact(active, [a, b, fa])
+    args = _compact(active, args)
+
+    for _ in range(max_iter):
+        if not len(active):
+            break
+
+        m = (a + b) / 2
+        with np.errstate(all='ignore'):
+            fm = f(m, *args)
+
+        left = fm * fa < 0
+        b = np.where(left, m, b)
+        a = np.where(left, a, m)
+        fa = np.where(left, fa, fm)
+
+        x[active] = m
+        done = np.abs(fm) < eps
+        converged[active[done]] = True
+
+        keep = ~done
+        active, a, b, fa = _compact(keep, [active, a, b, fa])
+        args = _compact(keep, args)
+
+    return x.reshape(shape), converged.reshape(shape)
+
+
+def chord_method_batch(f, a, b, eps=1e-6, max_iter=100, args=()):
+    """
+    Solve f(x, *args) = 0 on every bracket [a, b] at once with the Illinois variant of
+    regula falsi: the chord always joins the ends of a bracket with a sign change, and the value
+    at the end kept twice in a row is halved, so both ends move and the convergence is superlinear.
+    A bracket is finished when |f(x)| < eps, a lane whose chord is not finite stops
+    unconverged. The arguments and the result are those of bin_search_batch.
+    """
+    a, b, fa, fb, args, shape = _lanes(f, a, b, args)
+    x, converged, active = _start(a, b, fa, fb)
+    a, b, fa, fb = _compact(active, [a, b, fa, fb])
+    args = _compact(active, args)
+
+    for _ in range(max_iter):
+        if not len(active):
+            break
+
+        with np.errstate(all='ignore'):
+            c = b - fb * (b - a) / (fb - fa)
+            fc = f(c, *args)
+
+        a, b, fa, fb = _illinois_step(a, b, fa, fb, c, fc)
+
+        # a chord with fb == fa (e.g. after the halving underflowed) has no intersection
+        finite = np.isfinite(c)
+        x[active[finite]] = c[finite]
+        done = np.abs(fc) < eps
+        converged[active[done]] = True
+
+        keep = ~done & finite
+        active, a, b, fa, fb = _compact(keep, [active, a, b, fa, fb])
+        args = _compact(keep, args)
+
+    return x.reshape(shape), converged.reshape(shape)
+
+
+def newton_method_batch(f, a, b, eps=1e-6, max_iter=100, args=()):
+    """
+    Solve f(x, *args) = 0 by Newton's method from the midpoints of all brackets [a, b] at once.
+
+    f and f' of the unfinished lanes come from one evaluation of f at a Jet, or from finite
+    differences when f does not accept Jets. Every lane keeps a bracket of its root, shrunk
+    by the sign of f at each iterate. A Newton step that leaves the bracket, or has a zero
+    derivative, is replaced by bisection, so a lane never converges to a root of another bracket.
+    The sign checks of newton_method are not needed. A lane where f is not finite stops
+    unconverged. The arguments and the result are those of bin_search_batch.
+    """
+    a, b, fa, fb, args, shape = _lanes(f, a, b, args)
+    x, converged, active = _start(a, b, fa, fb)
+
+    lo, hi, flo = _compact(active, [a, b, fa])
+    x[active] = (lo + hi) / 2
+    args = _compact(active, args)
+
+    if len(active):
+        # the closure sees the compacted parameters of every iteration
+        step = _taylor_of(lambda t: f(t, *args), x[active], 1)
+
+    for _ in range(max_iter):
+        if not len(active):
+            break
+
+        xk = x[active]
+        with np.errstate(all='ignore'):
+            fx, df_dx = step(xk)
+            fx = np.broadcast_to(fx, xk.shape)
+            df_dx = np.broadcast_to(df_dx, xk.shape)
+
+            done = np.abs(fx) < eps
+            converged[active[done]] = True
+            failed = ~done & ~np.isfinite(fx)
+
+        x_new, lo, hi, flo = _newton_step(xk, fx, df_dx, lo, hi, flo)
+
+        moving = ~done & ~failed
+        x[active[moving]] = x_new[moving]
+
+        active, lo, hi, flo = _compact(moving, [active, lo, hi, flo])
+        args = _compact(moving, args)
+
+    return x.reshape(shape), converged.reshape(shape)
@@ -1,6 +1,17 @@
-from compmath.calc import derivative_at_point, second_derivative_at_point
+from collections import OrderedDict
+import weakref
+from compmath.calc import derivative_at_point, second_derivative_at_point, derivatives
 import numpy as np
 
+# Points of the grid the signs of f' and f'' are checked on
+SIGN_CHECK_POINTS = 100
+
+# Results of the sign checks kept per (f, a, b), repeated solves on a bracket skip the checks.
+# The cache holds f only through a weak reference, its entries go when f is collected.
+SIGN_CHECK_CACHE_SIZE = 32
+
+_sign_checks = OrderedDict()
+
 
 def simple_iteration(phi, f, a, b, eps=1e-6, max_iter=100):
     """
@@ -100,15 +111,91 @@ def bin_search(f, a, b, eps=1e-6, max_iter=100):
     raise RuntimeError("Method did not converge within the maximum number of iterations")
 
 
-def _is_sign_constant(f, a, b):
-    grid = np.linspace(a, b, 100)
-    sign = f(a) > 0
+def _sample(f, x):
+    """
+    f at all points of x, in one call when f takes arrays and point by point otherwise.
+    Returns the values and whether f took the array.
+    """
+    try:
+        with np.errstate(all='ignore'):
+            y = np.asarray(f(x), dtype=np.float64)
+        if y.shape == x.shape:
+            return y, True
+    except Exception:
+        pass
+
+    return np.array([f(t) for t in x.ravel()], dtype=np.float64).reshape(x.shape), False
+
+
+def _grid_derivatives(f, grid):
+    """
+    Values with the signs of f' and f'' on the grid, from one evaluation of f at a Jet when f
+    takes arrays of Jets. Otherwise f is sampled once (in one call when it takes arrays) and the
+    first and second differences of the samples are used.
+    """
+    try:
+        with np.errstate(all='ignore'):
+            values = derivatives(f, grid, 2)
+        if values.shape == (3,) + grid.shape:
+            return values[1], values[2]
+    except Exception:
+        pass
+
+    y, _ = _sample(f, grid)
+
+    # differences at the level of the rounding errors of the samples count as zero
+    tol = 64 * np.finfo(np.float64).eps * np.max(np.abs(y))
+    d1, d2 = np.diff(y), np.diff(y, 2)
+    return np.where(np.abs(d1) > 2 * tol, d1, 0.0), np.where(np.abs(d2) > 4 * tol, d2, 0.0)
 
-    for x in grid:
-        if (f(x) > 0) != sign:
-            return False
 
-    return True
+def _is_sign_constant(values):
+    positive = values > 0
+    return bool(np.all(positive == positive[0]))
+
+
+def _forget(ref):
+    for key in [key for key in _sign_checks if key[0] is ref]:
+        del _sign_checks[key]
+
+
+def _check_signs(f, a, b):
+    """
+    Whether f' and f'' keep their signs on [a, b], cached per (f, a, b).
+    Functions that can not be weakly referenced are checked every time.
+    """
+    try:
+        key = (weakref.ref(f, _forget), float(a), float(b))
+        hash(key)
+    except TypeError:
+        key = None
+
+    if key in _sign_checks:
+        _sign_checks.move_to_end(key)
+        return _sign_checks[key]
+
+    first, second = _grid_derivatives(f, np.linspace(a, b, SIGN_CHECK_POINTS))
+    result = _is_sign_constant(first), _is_sign_constant(second)
+
+    if key is not None:
+        _sign_checks[key] = result
+        if len(_sign_checks) > SIGN_CHECK_CACHE_SIZE:
+            _sign_checks.popitem(last=False)
+    return result
+
+
+def _taylor_of(f, x, order=1):
+    """
+    A function returning [f, f', ..., f^(order)] at a point. The derivatives are exact and take
+    one evaluation of f at a Jet, finite differences are used when f does not accept Jets.
+    """
+    try:
+        derivatives(f, x, order)
+    except (TypeError, AttributeError):
+        finite = (f, lambda t: derivative_at_point(f, t), lambda t: second_derivative_at_point(f, t))
+        return lambda t: [g(t) for g in finite[:order + 1]]
+
+    return lambda t: derivatives(f, t, order)
 
 
 def newton_method(f, a, b, eps=1e-6, max_iter=100):
@@ -127,30 +214,104 @@ def newton_method(f, a, b, eps=1e-6, max_iter=100):
     if f(a) * f(b) > 0:
         raise ValueError("No root found in the given interval")
 
-    if not _is_sign_constant(lambda x: derivative_at_point(f, x), a, b):
+    first, second = _check_signs(f, a, b)
+
+    if not first:
         raise ValueError("First derivative of f is not sign constant")
 
-    if not _is_sign_constant(lambda x: second_derivative_at_point(f, x), a, b):
+    if not second:
         raise ValueError("Second derivative of f is not sign constant")
 
+    step = _taylor_of(f, a, 1)
+
     x = (a + b) / 2
 
     log = [('x_k', 'f(x_k)', "f'(x_k)", 'x_k+1', '|x_new - x|')]
 
     for _ in range(max_iter):
-        df_dx = derivative_at_point(f, x)
+        fx, df_dx = (float(v) for v in step(x))
 
         if abs(df_dx) < 1e-10:
             raise ValueError("Derivative is close to zero. Newton's method may not converge")
 
-        x_new = x - f(x) / df_dx
+        x_new = x - fx / df_dx
+
+        log.append((x, fx, df_dx, x_new, abs(x_new - x)))
+
+        if abs(fx) < eps:
+            return log
+
+        x = x_new
+
+    raise RuntimeError("Method did not converge within the maximum number of iterations")
+
+
+def _newton_step(x, fx, df_dx, lo, hi, flo):
+    """
+    One safeguarded Newton step, for scalars or arrays of lanes. The bracket [lo, hi] of the root
+    is shrunk by the sign of f(x), a step that leaves it is replaced by bisection.
+    Returns the new iterate and the new lo, hi, f(lo).
+    """
+    with np.errstate(all='ignore'):
+        left = fx * flo < 0
+        hi = np.where(left, x, hi)
+        lo = np.where(left, lo, x)
+        flo = np.where(left, flo, fx)
+        x_new = x - fx / df_dx
+    x_new = np.where((lo < x_new) & (x_new < hi), x_new, (lo + hi) / 2)
+    return x_new, lo, hi, flo
+
+
+def _illinois_step(a, b, fa, fb, c, fc):
+    """
+    Replace an end of the bracket [a, b] by the chord point c. When the sign change is between
+    b and c, b becomes the other end, otherwise a is kept again with its value halved.
+    Returns the new a, b, f(a), f(b).
+    """
+    switch = fc * fb < 0
+    return np.where(switch, b, a), c, np.where(switch, fb, fa / 2), fc
+
 
-        log.append((x, f(x), df_dx, x_new, abs(x_new - x)))
+def _newton_bracket(f, a, b, eps=1e-6, max_iter=100):
+    """
+    Newton's method kept inside the bracket [a, b] with f(a) * f(b) < 0, without the sign checks
+    of newton_method. Returns a log in the format of newton_method.
+    """
+    step = _taylor_of(f, a, 1)
+    lo, hi, flo = a, b, f(a)
+    x = (a + b) / 2
 
-        if abs(f(x)) < eps:
+    log = [('x_k', 'f(x_k)', "f'(x_k)", 'x_k+1', '|x_new - x|')]
+
+    for _ in range(max_iter):
+        fx, df_dx = (float(v) for v in step(x))
+        x_new, lo, hi, flo = (float(v) for v in _newton_step(x, fx, df_dx, lo, hi, flo))
+
+        log.append((x, fx, df_dx, x_new, abs(x_new - x)))
+
+        if abs(fx) < eps:
             return log
 
         x = x_new
 
     raise RuntimeError("Method did not converge within the maximum number of iterations")
 
+
+def _chord_bracket(f, a, b, eps=1e-6, max_iter=100):
+    """
+    The Illinois variant of regula falsi on the bracket [a, b] with f(a) * f(b) < 0.
+    Returns a log in the format of chord_method, the root is in the column x1.
+    """
+    fa, fb = f(a), f(b)
+    log = [('x0', 'x1', 'x2', 'f(x0)', 'f(x1)', 'f(x2)', 'x1 - x0')]
+
+    for _ in range(max_iter):
+        c = b - fb * (b - a) / (fb - fa)
+        fc = f(c)
+        a, b, fa, fb = (float(v) for v in _illinois_step(a, b, fa, fb, c, fc))
+        log.append((a, b, c, fa, fb, fc, b - a))
+
+        if abs(fc) < eps:
+            return log
+
+    raise RuntimeError("Method did not converge within the maximum number of iterations")
@@ -1,17 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
 from compmath._base import BasicSolver
 from compmath.nonlinear import bin_search, newton_method, chord_method, simple_iteration
+from compmath.nonlinear import bin_search_batch, newton_method_batch, chord_method_batch
+from compmath.nonlinear._equation import _sample, _newton_bracket, _chord_bracket
+
+# Segments of the sign-change scan of find_all_roots
+SCAN_POINTS = 1000
+
+# Segments every suspected pair of close roots is split into per refinement level
+REFINE_POINTS = 8
+
+# method: (scalar solver, batched solver, column of the root in the log of the scalar one).
+# The scalar solvers run the same bracketed iterations as the batched ones, so every path
+# of find_all_roots gives the same roots.
+_ROOT_FINDERS = {
+    'bin_search': (bin_search, bin_search_batch, 2),
+    'chord_method': (_chord_bracket, chord_method_batch, 1),
+    'newton_method': (_newton_bracket, newton_method_batch, 0),
+}
 
 
 def count_solutions(f, a, b):
     step = (b - a) / 1000
-    cnt = 0
+    y, _ = _sample(f, a + np.arange(1000) * step)
+
+    return int(np.count_nonzero(y[:-1] * y[1:] < 0))
+
+
+def _scan(x, y):
+    """
+    Look through the samples y of f at the rows of x.
+    Returns the brackets with a sign change (lo, hi), the points where f is zero and the
+    intervals (lo, hi) where two close roots may hide between the samples: around local minima
+    of |f| where the parabola through three samples crosses zero, and next to a zero sample
+    unless f changes sign across it. A segment that ends at a zero sample has no sign change
+    even when it holds another root.
+    """
+    change = y[:, :-1] * y[:, 1:] < 0
+    lo, hi = x[:, :-1][change], x[:, 1:][change]
+    zeros = x[y == 0]
+
+    y0, y1, y2 = np.abs(y[:, :-2]), np.abs(y[:, 1:-1]), np.abs(y[:, 2:])
+    same_sign = (y[:, :-2] * y[:, 1:-1] > 0) & (y[:, 1:-1] * y[:, 2:] > 0)
+    with np.errstate(all='ignore'):
+        vertex = y1 - (y2 - y0) ** 2 / (8 * (y0 - 2 * y1 + y2))
+    suspect = same_sign & (y1 < y0) & (y1 <= y2) & (vertex <= 0)
+
+    # the sample on the other side of the zero, nan beyond the ends of a row where it is unknown.
+    # f vanishing on both sides of it is left alone.
+    outer = np.pad(y, ((0, 0), (1, 1)), constant_values=np.nan)
+    before, after = outer[:, :-3], outer[:, 3:]
+    left_zero = (y[:, :-1] == 0) & (np.abs(y[:, 1:]) > 0) & (before != 0) & ~(before * y[:, 1:] < 0)
+    right_zero = (y[:, 1:] == 0) & (np.abs(y[:, :-1]) > 0) & (after != 0) & ~(after * y[:, :-1] < 0)
+    near_zero = left_zero | right_zero
+
+    suspect_lo = np.concatenate((x[:, :-2][suspect], x[:, :-1][near_zero]))
+    suspect_hi = np.concatenate((x[:, 2:][suspect], x[:, 1:][near_zero]))
+    return lo, hi, zeros, suspect_lo, suspect_hi
+
+
+def _solve_bracket(method, f, lo, hi, eps, max_iter):
+    return _ROOT_FINDERS[method][0](f, lo, hi, eps=eps, max_iter=max_iter)
+
 
-    for i in range(999):
-        x0 = a + i * step
-        x1 = a + (i + 1) * step
-        cnt += f(x0) * f(x1) < 0
+def find_all_roots(f, a, b, method='chord_method', eps=1e-6, max_iter=100, refine=3, logs=False,
+                   workers=None, executor=None):
+    """
+    Find all roots of f on [a, b].
 
-    return cnt
+    f is sampled once on SCAN_POINTS segments (in one call when it takes arrays) and every
+    sign change gives a bracket. Around the local minima of |f| that look like two close roots
+    between the samples the scan is repeated on a finer grid, up to refine levels.
+    Roots of even multiplicity (tangencies) do not change sign and are found only when a sample
+    hits them exactly. The segments next to such a sample are scanned again as well, another
+    root in them would not change the sign either.
+
+    Args:
+    f: The function.
+    a, b: The interval.
+    method: 'bin_search', 'chord_method' or 'newton_method'.
+    eps: Tolerance for stopping criterion of every bracket (default: 1e-6).
+    max_iter: Maximum number of iterations per bracket (default: 100).
+    refine: The number of refinement levels of the scan.
+    logs: Also return the log of every bracket. The brackets are then solved one by one,
+    otherwise all of them together by the batched methods when f takes arrays. The logs have
+    the format of the scalar methods, but chord_method is the Illinois regula falsi and
+    newton_method skips its sign checks and is kept inside the bracket, as the batched versions.
+    workers: Solve the brackets one by one in a pool of this many processes, f must be picklable.
+    executor: A concurrent.futures pool to use instead of creating one for workers.
+
+    Returns:
+    Sorted array of the roots, and the list of their logs if logs. The log of a root hit by
+    a sample is [('x', 'f(x)'), (x, 0.0)].
+    """
+    if method not in _ROOT_FINDERS:
+        raise ValueError(f'Method {method} does not support finding all roots')
+
+    x = np.linspace(a, b, SCAN_POINTS + 1)
+    y, vectorized = _sample(f, x)
+    lo, hi, zeros, suspect_lo, suspect_hi = _scan(x[None], y[None])
+    brackets, found = [(lo, hi)], [zeros]
+
+    for _ in range(refine):
+        if not len(suspect_lo):
+            break
+        x = suspect_lo[:, None] + (suspect_hi - suspect_lo)[:, None] * np.linspace(0, 1, REFINE_POINTS + 1)
+        y, _ = _sample(f, x)
+        lo, hi, zeros, suspect_lo, suspect_hi = _scan(x, y)
+        brackets.append((lo, hi))
+        found.append(zeros)
+
+    lo = np.concatenate([bracket[0] for bracket in brackets])
+    hi = np.concatenate([bracket[1] for bracket in brackets])
+    # a zero sample at the end of a suspected interval is sampled again by the finer scans
+    zeros = np.unique(np.concatenate(found))
+
+    solver, batched, column = _ROOT_FINDERS[method]
+    pool = executor
+    if pool is None and workers is not None and workers > 1:
+        pool = ProcessPoolExecutor(workers)
+
+    try:
+        if logs or pool is not None or not vectorized:
+            if pool is None:
+                bracket_logs = [solver(f, l, h, eps=eps, max_iter=max_iter) for l, h in zip(lo, hi)]
+            else:
+                bracket_logs = list(pool.map(_solve_bracket, repeat(method), repeat(f), lo, hi,
+                                             repeat(eps), repeat(max_iter)))
+            roots = np.array([log[-1][column] for log in bracket_logs], dtype=np.float64)
+        else:
+            roots, converged = batched(f, lo, hi, eps=eps, max_iter=max_iter)
+            if not np.all(converged):
+                raise RuntimeError("Method did not converge within the maximum number of iterations")
+            bracket_logs = None
+    finally:
+        if pool is not None and pool is not executor:
+            pool.shutdown()
+
+    roots = np.concatenate((roots, zeros))
+    order = np.argsort(roots)
+    if not logs:
+        return roots[order]
+
+    bracket_logs += [[('x', 'f(x)'), (float(z), 0.0)] for z in zeros]
+    return roots[order], [bracket_logs[i] for i in order]
 
 
 class NLESolver(BasicSolver):
@@ -36,6 +170,11 @@ class NLESolver(BasicSolver):
         a = kwargs['a']
         b = kwargs['b']
 
+        if kwargs.get('all_roots'):
+            return find_all_roots(func, a, b, method, eps=self.eps, max_iter=self.max_iter,
+                                  refine=kwargs.get('refine', 3), logs=kwargs.get('logs', False),
+                                  workers=kwargs.get('workers'), executor=kwargs.get('executor'))
+
         solutions_cnt = count_solutions(func, a, b)
         if solutions_cnt > 1:
             raise ValueError('There are multiple solutions on the given segment')
@@ -48,5 +187,3 @@ class NLESolver(BasicSolver):
             return simple_iteration(phi, func, a, b, eps=self.eps)
 
         return self.method_to_func[method](func, a, b, eps=self.eps)
-
-
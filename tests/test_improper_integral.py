@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from compmath.calc import check_convergence, improper_integral, trapezoidal
+
+
+@pytest.mark.parametrize('f, a, b', [
+    (lambda x: 1 / (x - 0.3) ** 2, 0, 1),
+    (lambda x: 1 / (x - 0.3) ** 2, 0, 7.3),
+    (lambda x: 1 / (x - 0.3) ** 3, 0, 1),
+    (lambda x: 1 / (x - 0.5123) ** 2, 0, 1),
+])
+def test_interior_singularity_diverges(f, a, b):
+    assert not check_convergence(f, a, b, vectorized=True)
+    with pytest.raises(Exception, match='Integral diverges'):
+        trapezoidal(f, a, b, vectorized=True)
+
+
+@pytest.mark.parametrize('f, a, b', [
+    (np.exp, 0, 1),
+    (lambda x: 1 / np.sqrt(np.abs(x - 0.3)), 0, 1),
+    (lambda x: np.where(x > 0.3, 1.0, 0.0), 0, 1),
+    (lambda x: 1 / (1e-4 + (x - 0.3) ** 2), 0, 1),
+    (lambda x: 1 / np.sqrt(x), 0, 1),
+    (lambda x: 1 / (1 + x * x), -np.inf, np.inf),
+])
+def test_integrable_converges(f, a, b):
+    assert check_convergence(f, a, b, vectorized=True)
+
+
+@pytest.mark.parametrize('f, a, b', [
+    (lambda x: 1 / x, 0, 1),
+    (lambda x: 1 / x, 1, np.inf),
+    (lambda x: np.ones_like(x), 0, np.inf),
+])
+def test_endpoint_divergence(f, a, b):
+    assert not check_convergence(f, a, b, vectorized=True)
+
+
+def test_narrow_peak_value():
+    log = improper_integral(lambda x: 1 / (1e-4 + (x - 0.3) ** 2), 0, 1, eps=1e-6, vectorized=True)
+    assert log[-1][2] == pytest.approx(100 * (np.arctan(70) + np.arctan(30)), rel=1e-8)
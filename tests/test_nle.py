@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from compmath.nonlinear import find_all_roots
+
+
+METHODS = ['bin_search', 'chord_method', 'newton_method']
+
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('logs', [False, True])
+def test_close_root_next_to_zero_sample(method, logs):
+    # the refined scan samples 1.0005 exactly, the root at 1 sits in the segment next to it
+    roots = find_all_roots(lambda x: (x - 1) * (x - 1.0005) * (x + 2), -3, 3, method=method,
+                           eps=1e-12, logs=logs)
+    if logs:
+        roots = roots[0]
+    np.testing.assert_allclose(roots, [-2, 1, 1.0005], atol=1e-9)
+
+
+@pytest.mark.parametrize('a, b, expected', [(0, 1, [0, 0.0005]), (-1, 1, [0.9995, 1])])
+def test_close_root_next_to_zero_end(a, b, expected):
+    f = lambda x: (x - expected[0]) * (x - expected[1])
+    np.testing.assert_allclose(find_all_roots(f, a, b, eps=1e-12), expected, atol=1e-9)
+
+
+def test_close_roots_between_samples():
+    roots = find_all_roots(lambda x: (x - 0.3001) * (x - 0.3004), 0, 1, eps=1e-12)
+    np.testing.assert_allclose(roots, [0.3001, 0.3004], atol=1e-9)
+
+
+def test_zero_sample_found_once():
+    np.testing.assert_array_equal(find_all_roots(lambda x: x * x, -1, 1), [0])
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from compmath import SoleData
+
+
+def test_grow_after_freeze_with_fewer_columns():
+    data = SoleData(_n=4, _m=4)
+    data.m = 5
+    data.set_A(3, 4, 7.0)
+    data.set_b(3, 2.0)
+    data.freeze()
+    data.unfreeze()
+
+    data.n = 6
+    assert np.shape(data.A.rows) == (6, 5)
+    assert np.shape(data.b.rows) == (6, 1)
+
+    data.set_A(5, 4, 3.0)
+    data.set_b(5, 1.0)
+    expected = np.zeros((6, 5))
+    expected[3, 4], expected[5, 4] = 7.0, 3.0
+    np.testing.assert_array_equal(data.A.rows, expected)
+    np.testing.assert_array_equal(data.b.rows.ravel(), [0, 0, 0, 2, 0, 1])
+
+
+def test_resize_freeze_cycles_keep_values():
+    rng = np.random.default_rng(0)
+    data = SoleData(_n=2)
+    expected_A, expected_b = np.zeros((2, 2)), np.zeros(2)
+
+    for n, m in [(5, 3), (3, 7), (9, 4), (4, 4), (12, 6)]:
+        data.n, data.m = n, m
+        grown_A = np.zeros((n, m))
+        r, c = min(n, len(expected_A)), min(m, expected_A.shape[1])
+        grown_A[:r, :c] = expected_A[:r, :c]
+        grown_b = np.zeros(n)
+        grown_b[:r] = expected_b[:r]
+        expected_A, expected_b = grown_A, grown_b
+
+        i, j = rng.integers(n), rng.integers(m)
+        data.set_A(i, j, float(i * m + j + 1))
+        data.set_b(i, float(i + 1))
+        expected_A[i, j], expected_b[i] = i * m + j + 1, i + 1
+
+        A, b = data.freeze()
+        np.testing.assert_array_equal(A.rows, expected_A)
+        np.testing.assert_array_equal(b.rows.ravel(), expected_b)
+        data.unfreeze()
+
+
+def test_frozen_system_is_read_only():
+    data = SoleData(_n=3)
+    A, b = data.freeze()
+    with pytest.raises(ValueError):
+        data.set_A(0, 0, 1.0)
+    with pytest.raises(ValueError):
+        data.n = 4
+    with pytest.raises(ValueError):
+        A.rows[0, 0] = 1.0
+
+    data.unfreeze()
+    data.set_A(0, 0, 1.0)
+    assert A.rows[0, 0] == 0